@@ -7,247 +7,908 @@ Built with Dash and Plotly, this dashboard includes:
 - A Sankey diagram of crime resolution outcomes
 - An interactive time-based line chart
 - A stacked bar chart comparing weekday vs weekend crimes
+- A day-of-week (or month) × hour heatmap
+- Arrest-rate trends with confidence intervals
+
+create_app builds an app without loading data: the layout is served by a
+function and the data is loaded on first use (see dashboard_data.py). Importing
+this module builds no app; server.py is the entry point. Several
+datasets can be served by one process; they are declared and evicted by
+registry.py, and selected with a dropdown or ?dataset=<name>.
 
 Author: Team 13
 Course: INF8808 – Data Visualization
 Date: June 2025
 """
 
+import functools
+import json
+import urllib.parse
+
 import dash
-import dash_html_components as html
-import dash_core_components as dcc
+import flask
+from dash import html, dcc
 from dash.dependencies import Input, Output
-import pandas as pd
-import plotly.express as px
 
+import arrest_rates
+import dashboard_data
+import export
+import figure_templates
+import heatmap
 import pre_process_data
-from sankey import create_sankey
+import workers
 from bar_chart import create_bar_chart
-from map import create_map
-from line_chart import create_interactive_hour_chart
+from line_chart import create_line_chart_from_counts
+from map import create_map, create_density_map, create_choropleth_map
+from sankey import create_sankey_from_counts
 
-app = dash.Dash(__name__)
-app.title = 'Project | INF8808'
+background_manager = workers.background_callback_manager()
 
-# Load all processed data
-df_dic = pre_process_data.preprocess_all()
+# Tile and boundary routes, registered on the Flask server by create_app
+routes = flask.Blueprint("dashboard", __name__)
 
-sankey_df = df_dic["sankey"]
-sankey_fig = create_sankey(sankey_df)
+# Callbacks declared with @callback, registered on every app built by create_app
+_callbacks = []
 
-bar_chart_df = df_dic["bar"]
-bar_fig = create_bar_chart(bar_chart_df)
 
-lineChart_df = df_dic["line"]
+def callback(*args, **kwargs):
+    """
+    Declares a dashboard callback, with the arguments of dash.Dash.callback.
+
+    Returns:
+        callable: Decorator recording the function and returning it unchanged.
+    """
+    def decorator(function):
+        _callbacks.append((args, kwargs, function))
+        return function
+    return decorator
 
-map_df = df_dic["map"]
-map_df['primary_type'] = map_df['primary_type'].astype(str).str.title()
-year_options = sorted(map_df['year'].dropna().unique())
-crime_counts = map_df['primary_type'].value_counts()
-default_crimes = sorted(crime_counts.nlargest(10).index.tolist())
-default_year = max(year_options)
-map_fig = create_map(map_df, selected_year=default_year, selected_crimes=default_crimes)
 
-# Layout
-app.layout = html.Div([
+def register_callbacks(app: dash.Dash):
+    """
+    Registers every declared callback on an app.
+
+    Args:
+        app (dash.Dash): Application built by create_app.
+    """
+    for args, kwargs, function in _callbacks:
+        app.callback(*args, **kwargs)(function)
+
+
+def serve_layout():
+    """
+    Builds the page layout; Dash calls it on every page load, so the data is
+    only loaded when the first page is served. Outside a request (callback
+    validation by create_app) the same components are built without data or
+    figures, so building the app imports neither the data nor Plotly.
+    The figures are filled in by the callbacks fired on page load.
+
+    Returns:
+        dash.html.Div: The page layout.
+    """
+    in_request = flask.has_request_context()
+    data = dashboard_data.get() if in_request else dashboard_data.LayoutPlaceholder()
+    # Figure templates import Plotly; the validation layout only needs the component ids
+    map_placeholder = (figure_templates.map_figure([figure_templates.map_placeholder_trace()], view=data.map_view)
+                       if in_request else {})
+    return html.Div([
+        dcc.Location(id="url", refresh=False),
 
-    html.Div([
         html.Div([
-            html.H1("Seven Years of Crime in Chicago", style={"fontSize": "3.5rem", "color": "white", "textAlign": "center"}),
-            html.P("Chicago Crime Data: 2018–2024", style={"fontSize": "1.3rem", "color": "white", "textAlign": "center"}),
-            html.A("Explore the Data Visualization", href="#section-map", style={"padding": "1rem 2.5rem", "backgroundColor": "#0A84FF", "color": "white", "borderRadius": "40px", "textDecoration": "none", "fontWeight": "bold", "marginTop": "2rem", "display": "inline-block", "boxShadow": "0 4px 12px rgba(0,0,0,0.3)"})
-        ], style={"zIndex": 2, "position": "relative", "textAlign": "center", "display": "flex", "flexDirection": "column", "justifyContent": "center", "alignItems": "center", "height": "100vh"}),
+            html.Div([
+                html.H1("Seven Years of Crime in Chicago", style={"fontSize": "3.5rem", "color": "white", "textAlign": "center"}),
+                html.P("Chicago Crime Data: 2018–2024", style={"fontSize": "1.3rem", "color": "white", "textAlign": "center"}),
+                html.A("Explore the Data Visualization", href="#section-map", style={"padding": "1rem 2.5rem", "backgroundColor": "#0A84FF", "color": "white", "borderRadius": "40px", "textDecoration": "none", "fontWeight": "bold", "marginTop": "2rem", "display": "inline-block", "boxShadow": "0 4px 12px rgba(0,0,0,0.3)"})
+            ], style={"zIndex": 2, "position": "relative", "textAlign": "center", "display": "flex", "flexDirection": "column", "justifyContent": "center", "alignItems": "center", "height": "100vh"}),
+
+            html.Div(style={"backgroundImage": 'url("/assets/chicago.jpg")', "backgroundSize": "cover", "backgroundPosition": "center", "position": "absolute", "top": 0, "left": 0, "width": "100%", "height": "100vh", "zIndex": 1, "filter": "brightness(0.4)"})
+        ], className="hero-fade", style={"position": "relative", "height": "100vh", "overflow": "hidden"}),
 
-        html.Div(style={"backgroundImage": 'url("/assets/chicago.jpg")', "backgroundSize": "cover", "backgroundPosition": "center", "position": "absolute", "top": 0, "left": 0, "width": "100%", "height": "100vh", "zIndex": 1, "filter": "brightness(0.4)"})
-    ], className="hero-fade", style={"position": "relative", "height": "100vh", "overflow": "hidden"}),
+        html.Div([
+            html.H2("Choose a dataset, a period and crime types", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
+            html.P(
+                "Drag the handles to restrict every chart below to a date range, such as a single summer or the last 90 days. "
+                "Pick how many of the most frequent crime types to show, or choose any set of types, including rare ones. "
+                "A dataset can also be opened directly with ?dataset=<name> in the address.",
+                style={
+                    "color": "#cccccc",
+                    "fontSize": "1.25rem",
+                    "textAlign": "center",
+                    "maxWidth": "780px",
+                    "margin": "10px auto 20px",
+                    "fontStyle": "italic",
+                    "lineHeight": "1.6"
+                }
+            ),
+            html.Div([
+                dcc.Dropdown(
+                    id="dataset-select",
+                    options=dashboard_data.datasets.options(),
+                    value=dashboard_data.datasets.default,
+                    clearable=False,
+                    style={"width": "300px", "display": "inline-block", "textAlign": "left"}
+                ),
+                html.Div(id="dataset-memory", style={"color": "#888888", "fontSize": "0.9rem", "marginTop": "5px"})
+            ], style={"textAlign": "center", "marginBottom": "20px"}),
+            html.Div(id="date-range-label", style={"color": "white", "fontWeight": "bold", "textAlign": "center", "marginBottom": "15px"}),
+            html.Div(
+                dcc.RangeSlider(
+                    id="date-range-slider",
+                    min=data.full_range[0],
+                    max=data.full_range[1],
+                    step=1,
+                    value=data.full_range,
+                    marks=data.date_marks,
+                    allowCross=False,
+                    updatemode="mouseup"
+                ),
+                style={"padding": "0 10%"}
+            ),
+            html.Div([
+                html.Div([
+                    html.Label("Most frequent crime types", style={"color": "white", "fontWeight": "bold", "marginBottom": "5px"}),
+                    dcc.Slider(
+                        id="crime-top-n",
+                        min=1,
+                        max=len(data.crime_options),
+                        step=1,
+                        value=len(data.default_codes),
+                        marks={n: str(n) for n in [1] + list(range(5, len(data.crime_options) + 1, 5))},
+                        tooltip={"placement": "bottom"}
+                    )
+                ], style={"flex": "1"}),
+                html.Div([
+                    html.Label("Crime types", style={"color": "white", "fontWeight": "bold", "marginBottom": "5px"}),
+                    dcc.Dropdown(
+                        id="crime-select",
+                        options=data.crime_options,
+                        value=data.default_codes,
+                        multi=True,
+                        style={"width": "100%"}
+                    )
+                ], style={"flex": "2"}),
+            ], style={
+                "display": "flex",
+                "gap": "20px",
+                "padding": "30px 10% 0",
+                "flexWrap": "wrap",
+            }),
+            html.Div([
+                html.Span("Download the matching incidents: ", style={"color": "white", "fontWeight": "bold"}),
+                html.A("CSV", id="export-csv", href="/export?format=csv", target="_blank", style={"color": "#0A84FF", "marginRight": "10px"}),
+                html.A("Parquet", id="export-parquet", href="/export?format=parquet", target="_blank", style={"color": "#0A84FF", "marginRight": "10px"}),
+                html.Span(id="export-preview", style={"color": "#cccccc"})
+            ], style={"textAlign": "center", "paddingTop": "20px"})
+        ], id="section-dates", style={"backgroundColor": "#111111", "padding": "40px 0"}),
 
-    html.Div([
-        html.H2("Where are crimes located in Chicago?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
+        html.Div([
+            html.H2("Where are crimes located in Chicago?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
 
-        html.P(
-            "Use the dropdown menus to explore how different crimes are distributed across the city. "
-            "Larger circles indicate higher concentrations of crime, and you can hover over them for more details.",
+            html.P(
+                "Use the dropdown menus to explore how different crimes are distributed across the city. "
+                "Larger circles indicate higher concentrations of crime, and you can hover over them for more details.",
+                style={
+                    "color": "#cccccc",
+                    "fontSize": "1.25rem",
+                    "textAlign": "center",
+                    "maxWidth": "780px",
+                    "margin": "10px auto 20px",
+                    "fontStyle": "italic",
+                    "lineHeight": "1.6"
+                }
+            ),
+
+            html.P(
+            "Each circle on the map represents a group of nearby crimes clustered within roughly 1500 meters. "
+            "The size of the circle reflects the number of crimes in that area, and the color shows the selected crime type."
+            "The map highlights that most common crimes, such as theft, burglary, and criminal damage, tend to cluster around densely populated areas.",
             style={
-                "color": "#cccccc",
-                "fontSize": "1.25rem",
+                "color": "#ffffff",
+                "fontSize": "1.4rem",
                 "textAlign": "center",
-                "maxWidth": "780px",
-                "margin": "10px auto 20px",
-                "fontStyle": "italic",
+                "maxWidth": "800px",
+                "margin": "0 auto 20px",
+                "fontWeight": "500",
                 "lineHeight": "1.6"
-            }
-        ),
-
-        html.P(
-        "Each circle on the map represents a group of nearby crimes clustered within roughly 1500 meters. "
-        "The size of the circle reflects the number of crimes in that area, and the color shows the selected crime type."
-        "The map highlights that most common crimes, such as theft, burglary, and criminal damage, tend to cluster around densely populated areas.",
-        style={
-            "color": "#ffffff",
-            "fontSize": "1.4rem",
-            "textAlign": "center",
-            "maxWidth": "800px",
-            "margin": "0 auto 20px",
-            "fontWeight": "500",
-            "lineHeight": "1.6"
-            }
-        ),
+                }
+            ),
+
+            html.Div([
+                html.Div([
+                    html.Label("Select Year", style={"color": "white", "fontWeight": "bold", "marginBottom": "5px"}),
+                    dcc.Dropdown(
+                        id="year-dropdown",
+                        options=[{"label": str(y), "value": y} for y in data.year_options],
+                        value=data.default_year,
+                        clearable=False,
+                        style={"width": "100%"}
+                    )
+                ], style={"flex": "1"}),
+                html.Div([
+                    html.Label("Display", style={"color": "white", "fontWeight": "bold", "marginBottom": "5px"}),
+                    dcc.RadioItems(
+                        id="map-mode",
+                        options=map_mode_options(data),
+                        value="clusters",
+                        labelStyle={"color": "white", "marginRight": "15px"}
+                    )
+                ], style={"flex": "1"}),
+            ], style={
+                "display": "flex",
+                "gap": "20px",
+                "padding": "0 10% 30px",
+                "flexWrap": "wrap",
+            }),
+
+            dcc.Graph(
+                id="map-figure",
+                figure=map_placeholder,
+                config={"displayModeBar": False, "scrollZoom": True },
+                style={"height": "900px", "marginTop": "10px", "maxWidth": "90%", "marginLeft": "auto", "marginRight": "auto"}
+            )
+        ], id="section-map", style={"backgroundColor": "#111111", "padding": "80px 0"}),
 
         html.Div([
+            html.H2("When Does Crime Peak?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
             html.Div([
-                html.Label("Select Year", style={"color": "white", "fontWeight": "bold", "marginBottom": "5px"}),
+            html.P(
+                "Click and drag to zoom in. Double-click to zoom out",
+                style={
+                    "color": "#cccccc",
+                    "fontSize": "1.25rem",
+                    "textAlign": "center",
+                    "maxWidth": "780px",
+                    "margin": "10px auto 20px",
+                    "fontStyle": "italic",
+                    "lineHeight": "1.6"
+                }
+            ),
+            html.P(
+            "This area chart shows the distribution of reported crimes across each hour of the day, each month of the year and every year. "
+            "This visualization helps identify the moment when law enforcement presence may be most critical.",
+            style={
+                "color": "#ffffff",
+                "fontSize": "1.4rem",
+                "textAlign": "center",
+                "maxWidth": "800px",
+                "margin": "0 auto 20px",
+                "fontWeight": "500",
+                "lineHeight": "1.6"
+                }
+            ),
+            html.Label("Select Time Unit", style={"color": "white", "fontWeight": "bold", "marginRight": "10px"}),
                 dcc.Dropdown(
-                    id="year-dropdown",
-                    options=[{"label": str(y), "value": y} for y in year_options],
-                    value=default_year,
+                    id="time-unit-dropdown",
+                    options=[
+                        {"label": "Hour", "value": "hour"},
+                        {"label": "Month", "value": "month"},
+                        {"label": "Year", "value": "year"},
+                    ],
+                    value="hour",
                     clearable=False,
-                    style={"width": "100%"}
+                    style={"width": "200px", "display": "inline-block", "marginRight": "40px"}
                 )
-            ], style={"flex": "1"}),
-        ], style={
-            "display": "flex",
-            "gap": "20px",
-            "padding": "0 10% 30px",
-            "flexWrap": "wrap",
-        }),
-
-        dcc.Graph(
-            id="map-figure",
-            figure=map_fig,
-            config={"displayModeBar": False, "scrollZoom": True },
-            style={"height": "900px", "marginTop": "10px", "maxWidth": "90%", "marginLeft": "auto", "marginRight": "auto"}
-        )
-    ], id="section-map", style={"backgroundColor": "#111111", "padding": "80px 0"}),
+            ], style={"textAlign": "center", "marginBottom": "20px"}),
+            dcc.Graph(
+                id="lichart_fig",
+                config={"displayModeBar": False},
+                style={"height": "75vh", "marginTop": "30px"}
+            )
+        ], id="section-hourly", style={"backgroundColor": "#111111", "padding": "80px 0"}),
 
-    html.Div([
-        html.H2("When Does Crime Peak?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
         html.Div([
-        html.P(
-            "Click and drag to zoom in. Double-click to zoom out",
+            html.H2("What does a typical week look like?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
+            html.P(
+            "This heatmap shows the number of reported crimes for every hour of each day of the week, or of each month, "
+            "over the whole months covered by the date range. "
+            "It reveals patterns hidden by the weekday vs weekend split, such as late Friday and Saturday nights.",
             style={
-                "color": "#cccccc",
-                "fontSize": "1.25rem",
+                "color": "#ffffff",
+                "fontSize": "1.4rem",
                 "textAlign": "center",
-                "maxWidth": "780px",
-                "margin": "10px auto 20px",
-                "fontStyle": "italic",
+                "maxWidth": "800px",
+                "margin": "0 auto 20px",
+                "fontWeight": "500",
                 "lineHeight": "1.6"
-            }
-        ),
-        html.P(
-        "This area chart shows the distribution of reported crimes across each hour of the day, each month of the year and every year. "
-        "This visualization helps identify the moment when law enforcement presence may be most critical.",
-        style={
-            "color": "#ffffff",
-            "fontSize": "1.4rem",
-            "textAlign": "center",
-            "maxWidth": "800px",
-            "margin": "0 auto 20px",
-            "fontWeight": "500",
-            "lineHeight": "1.6"
-            }
-        ),
-        html.Label("Select Time Unit", style={"color": "white", "fontWeight": "bold", "marginRight": "10px"}),
-            dcc.Dropdown(
-                id="time-unit-dropdown",
-                options=[
-                    {"label": "Hour", "value": "hour"},
-                    {"label": "Month", "value": "month"},
-                    {"label": "Year", "value": "year"},
-                ],
-                value="hour",
-                clearable=False,
-                style={"width": "200px", "display": "inline-block", "marginRight": "40px"}
+                }
+            ),
+            html.Div([
+                html.Label("Select Year", style={"color": "white", "fontWeight": "bold", "marginRight": "10px"}),
+                dcc.Dropdown(
+                    id="heatmap-year",
+                    options=[{"label": "All years", "value": "all"}] + [{"label": str(y), "value": y} for y in data.year_options],
+                    value="all",
+                    clearable=False,
+                    style={"width": "200px", "display": "inline-block", "marginRight": "40px"}
+                ),
+                dcc.RadioItems(
+                    id="heatmap-view",
+                    options=[
+                        {"label": "Day of week", "value": "weekday"},
+                        {"label": "Month", "value": "month"},
+                    ],
+                    value="weekday",
+                    labelStyle={"color": "white", "marginRight": "15px"},
+                    style={"display": "inline-block"}
+                )
+            ], style={"textAlign": "center", "marginBottom": "20px"}),
+            dcc.Graph(
+                id="heatmap-figure",
+                config={"displayModeBar": False},
+                style={"height": "500px", "marginTop": "30px", "maxWidth": "90%", "marginLeft": "auto", "marginRight": "auto"}
             )
-        ], style={"textAlign": "center", "marginBottom": "20px"}),
-        dcc.Graph(
-            id="lichart_fig",
-            figure=create_interactive_hour_chart(lineChart_df, "hour"),
-            config={"displayModeBar": False},
-            style={"height": "75vh", "marginTop": "30px"}
-        )
-    ], id="section-hourly", style={"backgroundColor": "#111111", "padding": "80px 0"}),
+        ], id="section-heatmap", style={"backgroundColor": "#111111", "padding": "80px 0"}),
+
+        html.Div([
+            html.H2("Are weekends more dangerous?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
+            html.P(
+                "Click and drag to zoom in. Double-click to zoom out",
+                style={
+                    "color": "#cccccc",
+                    "fontSize": "1.25rem",
+                    "textAlign": "center",
+                    "maxWidth": "780px",
+                    "margin": "10px auto 20px",
+                    "fontStyle": "italic",
+                    "lineHeight": "1.6"
+                }
+            ),
+            html.P(
+            "This stacked bar chart compares the total number of crimes occurring on weekdays versus weekends. "
+            "While crime volume is clearly higher on weekdays, the distribution of crime types remains relatively consistent. "
+            "This suggests that although weekends are perceived as more risky, weekdays see significantly more incidents overall.",
+            style={
+                "color": "#ffffff",
+                "fontSize": "1.4rem",
+                "textAlign": "center",
+                "maxWidth": "800px",
+                "margin": "0 auto 20px",
+                "fontWeight": "500",
+                "lineHeight": "1.6"
+                }
+            ),
+            dcc.Graph(id='bar-weekend-chart', config={"displayModeBar": False}, style={"height": "75vh", "marginTop": "30px"})
+        ], id="section-weekend", style={"backgroundColor": "#111111", "padding": "80px 0"}),
+
+        html.Div([
+            html.H2("Which crimes are most associated with arrests?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
+            html.P(
+            "This Sankey diagram visualizes the flow from crime types to their resolution outcomes. "
+            "The thickness of each link represents the percentage of cases from each crime type resulting in an arrest or not. "
+            "Crimes such as Narcotics and Weapons Violations tend to show stronger flows toward arrests, while others are more often unresolved.",
+            style={
+                "color": "#ffffff",
+                "fontSize": "1.4rem",
+                "textAlign": "center",
+                "maxWidth": "800px",
+                "margin": "0 auto 20px",
+                "fontWeight": "500",
+                "lineHeight": "1.6"
+                }
+            ),
+            dcc.Graph(id="sankey-figure", config={"displayModeBar": False}, style={"height": "75vh", "marginTop": "30px"})
+        ], id="section-data", style={"backgroundColor": "#111111", "padding": "80px 0"}),
 
-    html.Div([
-        html.H2("Are weekends more dangerous?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
-        html.P(
-            "Click and drag to zoom in. Double-click to zoom out",
+        html.Div([
+            html.H2("Are arrests becoming more or less likely?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
+            html.P(
+            "This chart shows the share of incidents of each crime type that led to an arrest, by year or by month "
+            "of the year selected above the map, over the whole months covered by the date range. "
+            "Error bars are 95% confidence intervals: wide bars mean too few incidents to conclude. "
+            "Hover over the map clusters and the Sankey links for the arrest rate of an area or a crime type.",
             style={
-                "color": "#cccccc",
-                "fontSize": "1.25rem",
+                "color": "#ffffff",
+                "fontSize": "1.4rem",
                 "textAlign": "center",
-                "maxWidth": "780px",
-                "margin": "10px auto 20px",
-                "fontStyle": "italic",
+                "maxWidth": "800px",
+                "margin": "0 auto 20px",
+                "fontWeight": "500",
                 "lineHeight": "1.6"
-            }
-        ),
-        html.P(
-        "This stacked bar chart compares the total number of crimes occurring on weekdays versus weekends. "
-        "While crime volume is clearly higher on weekdays, the distribution of crime types remains relatively consistent. "
-        "This suggests that although weekends are perceived as more risky, weekdays see significantly more incidents overall.",
-        style={
-            "color": "#ffffff",
-            "fontSize": "1.4rem",
-            "textAlign": "center",
-            "maxWidth": "800px",
-            "margin": "0 auto 20px",
-            "fontWeight": "500",
-            "lineHeight": "1.6"
-            }
-        ),
-        dcc.Graph(id='bar-weekend-chart', config={"displayModeBar": False}, figure=bar_fig, style={"height": "75vh", "marginTop": "30px"})
-    ], id="section-weekend", style={"backgroundColor": "#111111", "padding": "80px 0"}),
-
-    html.Div([
-        html.H2("Which crimes are most associated with arrests?", style={"color": "white", "textAlign": "center", "fontSize": "2rem"}),
-        html.P(
-        "This Sankey diagram visualizes the flow from crime types to their resolution outcomes. "
-        "The thickness of each link represents the percentage of cases from each crime type resulting in an arrest or not. "
-        "Crimes such as Narcotics and Weapons Violations tend to show stronger flows toward arrests, while others are more often unresolved.",
-        style={
-            "color": "#ffffff",
-            "fontSize": "1.4rem",
-            "textAlign": "center",
-            "maxWidth": "800px",
-            "margin": "0 auto 20px",
-            "fontWeight": "500",
-            "lineHeight": "1.6"
-            }
-        ),
-        dcc.Graph(figure=sankey_fig, config={"displayModeBar": False}, style={"height": "75vh", "marginTop": "30px"})
-    ], id="section-data", style={"backgroundColor": "#111111", "padding": "80px 0"}),
-])
-
-@app.callback(
+                }
+            ),
+            html.Div([
+                dcc.RadioItems(
+                    id="rate-unit",
+                    options=[
+                        {"label": "By year", "value": "year"},
+                        {"label": "By month", "value": "month"},
+                    ],
+                    value="year",
+                    labelStyle={"color": "white", "marginRight": "15px"},
+                    style={"display": "inline-block"}
+                )
+            ], style={"textAlign": "center", "marginBottom": "20px"}),
+            dcc.Graph(id="rate-figure", config={"displayModeBar": False}, style={"height": "75vh", "marginTop": "30px"})
+        ], id="section-arrest-rates", style={"backgroundColor": "#111111", "padding": "80px 0"}),
+    ])
+
+
+def map_mode_options(data) -> list:
+    """
+    Args:
+        data (dashboard_data.DashboardData): Selected dataset.
+
+    Returns:
+        list of dict: Display modes of the map, with the choropleth layers available.
+    """
+    return [
+        {"label": "Clusters", "value": "clusters"},
+        {"label": "Density (all incidents)", "value": "density"},
+    ] + [{"label": layer.label, "value": key} for key, layer in data.choropleth_layers.items()]
+
+
+def create_app() -> dash.Dash:
+    """
+    Builds a Dash app without loading any data: the layout is a function and
+    the callbacks are registered on this app, so the factory can be called
+    several times (tests, several apps in one server).
+
+    Returns:
+        dash.Dash: The dashboard application.
+    """
+    app = dash.Dash(__name__, **({"background_callback_manager": background_manager} if background_manager else {}))
+    app.title = 'Project | INF8808'
+    # Assigning a layout function makes Dash call it to validate the callbacks
+    # unless a validation layout is already set; this one is built without data
+    app.validation_layout = serve_layout()
+    app.layout = serve_layout
+    app.server.register_blueprint(routes)
+    register_callbacks(app)
+    return app
+
+@callback(
+    Output("date-range-label", "children"),
+    [Input("date-range-slider", "value"), Input("dataset-select", "value")]
+)
+def update_date_label(date_range, dataset):
+    """
+    Displays the dates selected with the range slider.
+
+    Args:
+        date_range (list): [start, end] day offsets from the slider.
+        dataset (str): Selected dataset name.
+
+    Returns:
+        str: Human-readable range.
+    """
+    data = dashboard_data.get(dataset)
+    start, end = date_range or data.full_range
+    return f"{data.date_idx.dates[start]} → {data.date_idx.dates[end]}"
+
+def export_filters(data, args) -> export.ExportFilters:
+    """
+    Reads the export filters from query arguments: start and end (day offsets of
+    the date slider), years and crimes (codes joined by "-", "all" or "none") and
+    bounds ("lat_min,lat_max,lon_min,lon_max").
+
+    Args:
+        data (dashboard_data.DashboardData): Selected dataset.
+        args (dict): Query arguments.
+
+    Returns:
+        export.ExportFilters: The filters.
+
+    Raises:
+        ValueError: If an argument is malformed.
+    """
+    day_range = None
+    if args.get("start") is not None or args.get("end") is not None:
+        start, end = int(args.get("start", data.full_range[0])), int(args.get("end", data.full_range[1]))
+        day_range = data.date_idx.absolute_days(start, end)
+    years = None if args.get("years", "all") == "all" else [int(y) for y in args["years"].split("-")]
+    crimes = args.get("crimes", "all")
+    codes = None
+    if crimes == "none":
+        codes = []
+    elif crimes != "all":
+        codes = data.codes([int(c) for c in crimes.split("-")])
+    bounds = None
+    if args.get("bounds"):
+        bounds = tuple(float(v) for v in args["bounds"].split(","))
+        if len(bounds) != 4:
+            raise ValueError("bounds needs lat_min,lat_max,lon_min,lon_max")
+    return export.ExportFilters(day_range, years, codes, bounds)
+
+@routes.route("/export")
+def export_rows():
+    """
+    Streams the incidents of a dataset matching the filters (see export_filters)
+    as CSV or Parquet (format argument).
+
+    Returns:
+        flask.Response: Chunked file download.
+    """
+    dataset = flask.request.args.get("dataset")
+    fmt = flask.request.args.get("format", "csv")
+    if fmt not in export.FORMATS or (dataset is not None and dataset not in dashboard_data.datasets.specs):
+        flask.abort(404)
+    data = dashboard_data.get(dataset)
+    try:
+        filters = export_filters(data, flask.request.args)
+    except ValueError:
+        flask.abort(400)
+    mimetype, extension = export.FORMATS[fmt]
+    filename = f"{dataset or dashboard_data.datasets.default}_incidents.{extension}"
+    return flask.Response(
+        export.stream(data.store, filters, fmt), mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"}
+    )
+
+@routes.route("/export/preview")
+def export_preview():
+    """
+    Number of rows /export would return with the same arguments, from the precomputed counts.
+
+    Returns:
+        flask.Response: JSON {"rows": int, "exact": bool}.
+    """
+    dataset = flask.request.args.get("dataset")
+    if dataset is not None and dataset not in dashboard_data.datasets.specs:
+        flask.abort(404)
+    data = dashboard_data.get(dataset)
+    try:
+        filters = export_filters(data, flask.request.args)
+    except ValueError:
+        flask.abort(400)
+    return flask.jsonify(export.preview_count(data.date_idx, data.store, filters))
+
+@routes.route("/datasets")
+def datasets():
+    """
+    Lists the declared datasets, the resident ones with their memory use, and the budget.
+
+    Returns:
+        flask.Response: JSON document.
+    """
+    resident = dashboard_data.datasets.resident()
+    return flask.jsonify({
+        "budget_bytes": dashboard_data.datasets.budget,
+        "resident_bytes": sum(resident.values()),
+        "datasets": [
+            {"name": name, "label": spec["label"], "resident": name in resident, "bytes": resident.get(name, 0)}
+            for name, spec in dashboard_data.datasets.specs.items()
+        ],
+    })
+
+@routes.route("/tiles/density/<dataset>/<int:year>/<int:start>/<int:end>/<crime_key>/<int:z>/<int:x>/<int:y>.png")
+def density_tile(dataset, year, start, end, crime_key, z, x, y):
+    """
+    Serves a density tile of the given dataset, year, inclusive date range (days
+    since 1970-01-01) and crime-type codes ("all" or codes joined by "-").
+
+    Returns:
+        flask.Response: PNG tile, cached by the renderer and by the browser.
+    """
+    try:
+        crimes = None if crime_key == "all" else tuple(sorted(int(code) for code in crime_key.split("-")))
+    except ValueError:
+        flask.abort(400)
+    if dataset not in dashboard_data.datasets.specs or not 0 <= z <= 22 or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        flask.abort(404)
+    png = dashboard_data.get(dataset).density_renderer.tile(year, crimes, (start, end), z, x, y)
+    return flask.Response(png, mimetype="image/png", headers={"Cache-Control": "public, max-age=86400"})
+
+@routes.route("/boundaries/<dataset>/<key>.geojson")
+def boundaries(dataset, key):
+    """
+    Serves the boundaries of a choropleth layer, with the feature ids used by the map.
+
+    Returns:
+        flask.Response: GeoJSON document, cached by the browser.
+    """
+    if dataset not in dashboard_data.datasets.specs or key not in dashboard_data.get(dataset).choropleth_layers:
+        flask.abort(404)
+    return flask.Response(
+        boundary_json(dataset, key), mimetype="application/geo+json", headers={"Cache-Control": "public, max-age=86400"}
+    )
+
+@functools.lru_cache(maxsize=32)
+def boundary_json(dataset, key):
+    """
+    Args:
+        dataset (str): Dataset name.
+        key (str): Choropleth layer key.
+
+    Returns:
+        str: Serialized boundaries of the layer.
+    """
+    return json.dumps(dashboard_data.get(dataset).choropleth_layers[key].geojson)
+
+def density_tile_url(dataset, selected_year, day_range, crimes):
+    """
+    Builds the tile URL template of a dataset, year, date range and list of crime names.
+
+    Args:
+        dataset (str): Dataset name.
+        selected_year (int): Selected year.
+        day_range (tuple): Inclusive (start, end) in days since 1970-01-01.
+        crimes (list of str): Crime types shown on the map.
+
+    Returns:
+        str: URL with {z}/{x}/{y} placeholders, absolute when a request is active;
+            None when no crime type of the dataset is selected.
+    """
+    crime_codes = dashboard_data.get(dataset).crime_codes
+    crime_key = "-".join(str(code) for code in sorted(crime_codes[c] for c in crimes if c in crime_codes))
+    if not crime_key:
+        return None
+    root = flask.request.host_url if flask.has_request_context() else "/"
+    start, end = day_range
+    return f"{root}tiles/density/{dataset}/{selected_year}/{start}/{end}/{crime_key}/{{z}}/{{x}}/{{y}}.png"
+
+@callback(
+    Output("dataset-select", "value"),
+    [Input("url", "search")]
+)
+def select_dataset_from_url(search):
+    """
+    Selects the dataset named in the page address (?dataset=<name>).
+
+    Args:
+        search (str): Query string of the page address.
+
+    Returns:
+        str: Dataset name, or no update when the address names no known dataset.
+    """
+    name = urllib.parse.parse_qs((search or "").lstrip("?")).get("dataset", [None])[0]
+    if name not in dashboard_data.datasets.specs:
+        return dash.no_update
+    return name
+
+@callback(
+    [Output("date-range-slider", "min"), Output("date-range-slider", "max"),
+     Output("date-range-slider", "marks"), Output("date-range-slider", "value"),
+     Output("crime-top-n", "max"), Output("crime-top-n", "marks"), Output("crime-top-n", "value"),
+     Output("crime-select", "options"),
+     Output("year-dropdown", "options"), Output("year-dropdown", "value"),
+     Output("heatmap-year", "options"), Output("heatmap-year", "value"),
+     Output("map-mode", "options")],
+    [Input("dataset-select", "value")],
+    prevent_initial_call=True
+)
+def update_dataset_controls(dataset):
+    """
+    Resets the filters to the ranges, crime types and years of the selected dataset.
+    Loads the dataset if it is not resident.
+
+    Args:
+        dataset (str): Selected dataset name.
+
+    Returns:
+        tuple: New properties of the filter components.
+    """
+    data = dashboard_data.get(dataset)
+    n_types = len(data.crime_options)
+    return (
+        data.full_range[0], data.full_range[1], data.date_marks, data.full_range,
+        n_types, {n: str(n) for n in [1] + list(range(5, n_types + 1, 5))}, len(data.default_codes),
+        data.crime_options,
+        [{"label": str(y), "value": y} for y in data.year_options], data.default_year,
+        [{"label": "All years", "value": "all"}] + [{"label": str(y), "value": y} for y in data.year_options], "all",
+        map_mode_options(data),
+    )
+
+@callback(
+    Output("dataset-memory", "children"),
+    [Input("dataset-select", "value")]
+)
+def update_dataset_memory(dataset):
+    """
+    Reports the datasets resident in this process and their memory use.
+
+    Args:
+        dataset (str): Selected dataset name (loaded before reporting).
+
+    Returns:
+        str: Resident datasets and memory budget.
+    """
+    dashboard_data.get(dataset)
+    resident = dashboard_data.datasets.resident()
+    used = ", ".join(f"{name} {size / 2 ** 20:,.0f} MB" for name, size in resident.items())
+    return f"Loaded: {used} (budget {dashboard_data.datasets.budget / 2 ** 20:,.0f} MB)"
+
+@callback(
+    [Output("export-csv", "href"), Output("export-parquet", "href"), Output("export-preview", "children")],
+    [Input("date-range-slider", "value"), Input("year-dropdown", "value"), Input("crime-select", "value"),
+     Input("dataset-select", "value")]
+)
+def update_export_links(date_range, selected_year, codes, dataset):
+    """
+    Points the download links at the current filters and previews the row count.
+
+    Args:
+        date_range (list): [start, end] day offsets from the slider.
+        selected_year (int): Selected year from the dropdown.
+        codes (list of int): Selected crime-type codes.
+        dataset (str): Selected dataset name.
+
+    Returns:
+        tuple: CSV link, Parquet link and preview text.
+    """
+    data = dashboard_data.get(dataset)
+    start, end = date_range or data.full_range
+    args = {"dataset": dataset, "start": start, "end": end,
+            "years": "all" if selected_year is None else str(selected_year),
+            "crimes": "-".join(str(code) for code in data.codes(codes)) or "none"}
+    query = urllib.parse.urlencode(args)
+    preview = export.preview_count(data.date_idx, data.store, export_filters(data, args))
+    return f"/export?format=csv&{query}", f"/export?format=parquet&{query}", f"({preview['rows']:,} rows)"
+
+@callback(
+    Output("crime-select", "value"),
+    [Input("crime-top-n", "value"), Input("dataset-select", "value")],
+    prevent_initial_call=True
+)
+def update_crime_selection(top_n, dataset):
+    """
+    Selects the N most frequent crime types, from the precomputed counts.
+
+    Args:
+        top_n (int): Number of crime types.
+        dataset (str): Selected dataset name.
+
+    Returns:
+        list of int: Codes of the selected crime types.
+    """
+    return pre_process_data.select_crime_types(dashboard_data.get(dataset).store, top_n=top_n)
+
+@callback(
     Output("map-figure", "figure"),
-    [Input("year-dropdown", "value")]
+    [Input("year-dropdown", "value"), Input("date-range-slider", "value"), Input("map-mode", "value"), Input("crime-select", "value"),
+     Input("dataset-select", "value")],
+    **({"background": True} if background_manager else {})
 )
-def update_map(selected_year):
+def update_map(selected_year, date_range, map_mode, codes, dataset):
     """
-    Updates the crime map based on the selected year.
+    Updates the crime map based on the selected year, date range, display mode and crime types.
+    The clustering runs on the bounded heavy pool, and concurrent requests for
+    the same inputs share a single computation. Only the traces, layers and
+    title are sent back; the layout already in the browser is kept.
+    The density mode shows every incident of the selected year and date range as raster tiles,
+    and the choropleth modes shade police beats or community areas, counted
+    over the selected year and date range.
 
     Args:
         selected_year (int): Selected year from the dropdown.
+        date_range (list): [start, end] day offsets from the slider.
+        map_mode (str): "clusters", "density" or a choropleth layer key.
+        codes (list of int): Selected crime-type codes.
+        dataset (str): Selected dataset name.
 
     Returns:
-        plotly.graph_objects.Figure: Updated map.
+        dash.Patch: Partial update of the map (full figure dict on older Dash).
     """
-    return create_map(map_df, selected_year, default_crimes)
+    data = dashboard_data.get(dataset)
+    crimes = data.selected_crimes(codes)
+    day_range = data.date_idx.absolute_days(*(date_range or data.full_range))
+    if map_mode == "density":
+        tile_url = density_tile_url(dataset, selected_year, day_range, crimes)
+        return figure_templates.map_patch(create_density_map(selected_year, tile_url, data.map_view))
+    if map_mode in data.choropleth_layers:
+        root = flask.request.host_url if flask.has_request_context() else "/"
+        fig = create_choropleth_map(
+            data.choropleth_layers[map_mode], f"{root}boundaries/{dataset}/{map_mode}.geojson", selected_year,
+            [data.crime_codes[c] for c in crimes], crimes, day_range, data.map_view
+        )
+        return figure_templates.map_patch(fig)
+    if background_manager:
+        return figure_templates.map_patch(create_map(data.map_df, selected_year, crimes, day_range,
+                                                          data.arrest_rates, data.map_view))
+    key = ("map", dataset, selected_year, tuple(crimes), day_range)
+    fig = workers.run_heavy(key, create_map, data.map_df, selected_year, crimes, day_range,
+                            data.arrest_rates, data.map_view)
+    return figure_templates.map_patch(fig)
 
-@app.callback(
+@callback(
     Output("lichart_fig", "figure"),
-    [Input("time-unit-dropdown", "value")]  
+    [Input("time-unit-dropdown", "value"), Input("date-range-slider", "value"), Input("crime-select", "value"),
+     Input("dataset-select", "value")]
 )
-def update_chart(time_unit):
+def update_chart(time_unit, date_range, codes, dataset):
     """
     Updates the time-based line chart (hour/month/year) based on user selection.
 
     Args:
         time_unit (str): One of ["hour", "month", "year"].
+        date_range (list): [start, end] day offsets from the slider.
+        codes (list of int): Selected crime-type codes.
+        dataset (str): Selected dataset name.
+
+    Returns:
+        dict: Updated line chart.
+    """
+    data = dashboard_data.get(dataset)
+    start, end = date_range or data.full_range
+    return create_line_chart_from_counts(data.date_idx.line_counts(time_unit, start, end, data.codes(codes)), time_unit)
+
+@callback(
+    Output("heatmap-figure", "figure"),
+    [Input("heatmap-view", "value"), Input("heatmap-year", "value"), Input("date-range-slider", "value"),
+     Input("crime-select", "value"), Input("dataset-select", "value")]
+)
+def update_heatmap(view, year, date_range, codes, dataset):
+    """
+    Updates the hour heatmap by summing slices of the precomputed histogram,
+    over the whole months covered by the date range.
+
+    Args:
+        view (str): "weekday" or "month".
+        year (int or str): Selected year, or "all".
+        date_range (list): [start, end] day offsets from the slider.
+        codes (list of int): Selected crime-type codes.
+        dataset (str): Selected dataset name.
+
+    Returns:
+        dict: Updated heatmap.
+    """
+    data = dashboard_data.get(dataset)
+    years = None if year == "all" else [year]
+    month_range = arrest_rates.month_index(data.date_idx.absolute_days(*(date_range or data.full_range)))
+    return heatmap.create_heatmap(data.hour_histogram.counts(view, years, data.codes(codes), month_range), view)
+
+@callback(
+    Output("bar-weekend-chart", "figure"),
+    [Input("date-range-slider", "value"), Input("crime-select", "value"), Input("dataset-select", "value")]
+)
+def update_bar_chart(date_range, codes, dataset):
+    """
+    Updates the weekday vs weekend bar chart for the selected date range and crime types.
+
+    Args:
+        date_range (list): [start, end] day offsets from the slider.
+        codes (list of int): Selected crime-type codes.
+        dataset (str): Selected dataset name.
+
+    Returns:
+        dict: Updated bar chart.
+    """
+    data = dashboard_data.get(dataset)
+    start, end = date_range or data.full_range
+    return create_bar_chart(data.date_idx.bar_counts(start, end, data.codes(codes)))
+
+@callback(
+    Output("sankey-figure", "figure"),
+    [Input("date-range-slider", "value"), Input("crime-select", "value"), Input("dataset-select", "value")]
+)
+def update_sankey(date_range, codes, dataset):
+    """
+    Updates the Sankey diagram for the selected date range and crime types.
+
+    Args:
+        date_range (list): [start, end] day offsets from the slider.
+        codes (list of int): Selected crime-type codes.
+        dataset (str): Selected dataset name.
+
+    Returns:
+        plotly.graph_objects.Figure: Updated Sankey diagram.
+    """
+    data = dashboard_data.get(dataset)
+    start, end = date_range or data.full_range
+    return create_sankey_from_counts(data.date_idx.sankey_counts(start, end, data.codes(codes)))
+
+@callback(
+    Output("rate-figure", "figure"),
+    [Input("rate-unit", "value"), Input("date-range-slider", "value"), Input("year-dropdown", "value"),
+     Input("crime-select", "value"), Input("dataset-select", "value")]
+)
+def update_rate_chart(unit, date_range, selected_year, codes, dataset):
+    """
+    Updates the arrest-rate trend chart from the precomputed arrest cube.
+    Yearly rates cover the months overlapping the date range; monthly rates
+    are those of the selected year, within the same months.
+
+    Args:
+        unit (str): "year" or "month".
+        date_range (list): [start, end] day offsets from the slider.
+        selected_year (int): Selected year from the dropdown.
+        codes (list of int): Selected crime-type codes.
+        dataset (str): Selected dataset name.
 
     Returns:
-        plotly.graph_objects.Figure: Updated line chart.
+        dict: Updated arrest-rate chart.
     """
-    return create_interactive_hour_chart(lineChart_df, time_unit)
+    data = dashboard_data.get(dataset)
+    day_range = data.date_idx.absolute_days(*(date_range or data.full_range))
+    years = [selected_year] if unit == "month" and selected_year is not None else None
+    return arrest_rates.create_rate_chart(data.arrest_rates, data.codes(codes), years, unit, day_range)
 
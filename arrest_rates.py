@@ -0,0 +1,228 @@
+"""
+arrest_rates.py
+
+Arrest-rate statistics per crime type, year, month and spatial grid cell.
+Arrests and totals are counted once, when the column store is built, into two
+int32 cubes indexed by (crime type, year, month, cell) (column_store.arrest_cubes)
+and memory-mapped with the store, so workers share them and build nothing.
+Every query selects slices of the cubes and sums the other axes, and confidence
+intervals are Wilson score intervals computed on the resulting arrays; the
+incident rows are never scanned. Date ranges are resolved to whole months.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+
+import column_store
+import figure_templates
+import legend
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959963984540054
+
+AXES = ("crime", "year", "month", "cell")
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def wilson_interval(successes, totals, z: float = Z_95) -> tuple:
+    """
+    Wilson score interval of binomial proportions, vectorized.
+
+    Args:
+        successes (array-like): Number of arrests.
+        totals (array-like): Number of incidents.
+        z (float): Normal quantile of the confidence level.
+
+    Returns:
+        tuple: (low, high) arrays; NaN where totals is 0.
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = successes / totals
+        denominator = 1.0 + z ** 2 / totals
+        center = (p + z ** 2 / (2 * totals)) / denominator
+        margin = z * np.sqrt(p * (1 - p) / totals + z ** 2 / (4 * totals ** 2)) / denominator
+    return center - margin, center + margin
+
+
+def format_rates(rate, low, high) -> np.ndarray:
+    """
+    Args:
+        rate, low, high (array-like): Proportions and their interval.
+
+    Returns:
+        np.ndarray: Labels such as "21.4% (95% CI 20.9–21.9%)", "n/a" where undefined.
+    """
+    rate, low, high = (np.asarray(v, dtype=np.float64) * 100 for v in (rate, low, high))
+    labels = np.char.add(np.char.mod("%.1f%% (95%% CI ", rate), np.char.mod("%.1f", low))
+    labels = np.char.add(labels, np.char.mod("–%.1f%%)", high))
+    return np.where(np.isnan(rate), "n/a", labels)
+
+
+class ArrestRates:
+    """
+    (crime type, year, month, cell) cubes of arrests and incidents of a
+    column_store.ColumnStore.
+    """
+
+    def __init__(self, store):
+        """
+        Args:
+            store (column_store.ColumnStore): Store with the 'arrest_totals' and
+                'arrest_counts' aggregates.
+        """
+        self.years = np.asarray(store.years)
+        self.crime_types = [name.title() for name in store.crime_types]
+        self._codes = {name.upper(): code for code, name in enumerate(self.crime_types)}
+        self.grid_bounds, self.grid_size = store.grid
+        self.totals = store.aggregates['arrest_totals']
+        self.arrests = store.aggregates['arrest_counts']
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Private memory of the cubes; memory-mapped cubes are shared and not counted.
+        """
+        return sum(0 if isinstance(cube, np.memmap) else cube.nbytes for cube in (self.totals, self.arrests))
+
+    def crime_code(self, name: str) -> int:
+        """
+        Args:
+            name (str): Crime type, in any case.
+
+        Returns:
+            int: Its code, or -1 if the dataset does not have it.
+        """
+        return self._codes.get(str(name).upper(), -1)
+
+    def cells(self, lat, lon) -> np.ndarray:
+        """
+        Args:
+            lat, lon (array-like): Coordinates.
+
+        Returns:
+            np.ndarray: Grid cell of each point, as in the store's 'cell' column.
+        """
+        return column_store.grid_cells(lat, lon, self.grid_bounds, self.grid_size)
+
+    def counts(self, by: tuple = (), codes=None, years=None, months=None, cells=None, month_range=None) -> tuple:
+        """
+        Arrests and incidents of a selection, summed over the axes not kept.
+
+        Args:
+            by (tuple of str): Axes of AXES kept in the result, in AXES order.
+            codes (list of int): Crime-type codes, all when None.
+            years (list of int): Years, all when None.
+            months (list of int): Months (1-12), all when None.
+            cells (array-like of int): Grid cells, all when None; may repeat,
+                e.g. one cell per map cluster.
+            month_range (tuple): Inclusive (first, last) calendar months, as months
+                since 1970-01 (see month_index); months outside are left out.
+
+        Returns:
+            tuple: (arrests, totals) int64 arrays with one dimension per kept axis.
+        """
+        selections = {
+            "crime": None if codes is None else np.asarray(list(codes), dtype=np.int64),
+            "year": None if years is None else np.flatnonzero(np.isin(self.years, list(years))),
+            "month": None if months is None else np.asarray(list(months), dtype=np.int64) - 1,
+            "cell": None if cells is None else np.asarray(cells, dtype=np.int64),
+        }
+        in_range = None
+        if month_range is not None:
+            year_values = self.years if selections["year"] is None else self.years[selections["year"]]
+            month_values = np.arange(12) if selections["month"] is None else selections["month"]
+            index = (year_values.astype(np.int64)[:, None] - 1970) * 12 + month_values[None, :]
+            in_range = ((index >= month_range[0]) & (index <= month_range[1]))[None, :, :, None]
+
+        results = []
+        for cube in (self.arrests, self.totals):
+            for axis, name in enumerate(AXES):
+                if selections[name] is not None:
+                    cube = cube.take(selections[name], axis=axis)
+            if in_range is not None:
+                cube = np.where(in_range, cube, 0)
+            summed = tuple(axis for axis, name in enumerate(AXES) if name not in by)
+            results.append(cube.sum(axis=summed, dtype=np.int64))
+        return tuple(results)
+
+    def rates(self, by: tuple = (), codes=None, years=None, months=None, cells=None, month_range=None) -> dict:
+        """
+        Arrest rates of a selection with their Wilson 95% confidence interval.
+
+        Args:
+            by, codes, years, months, cells, month_range: See counts.
+
+        Returns:
+            dict: "arrests", "totals", "rate", "low" and "high" arrays
+                (NaN rates where there is no incident).
+        """
+        arrests, totals = self.counts(by, codes, years, months, cells, month_range)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = arrests / totals
+        low, high = wilson_interval(arrests, totals)
+        return {"arrests": arrests, "totals": totals, "rate": rate, "low": low, "high": high}
+
+
+def month_index(day_range: tuple) -> tuple:
+    """
+    Args:
+        day_range (tuple): Inclusive (start, end) in days since 1970-01-01.
+
+    Returns:
+        tuple: The calendar months covering the range, as months since 1970-01.
+    """
+    days = np.asarray(day_range, dtype=np.int64).astype('datetime64[D]')
+    first, last = days.astype('datetime64[M]').astype(np.int64)
+    return int(first), int(last)
+
+
+def create_rate_chart(rates: ArrestRates, codes: list, years=None, unit: str = "year", day_range: tuple = None) -> dict:
+    """
+    Arrest rate of each selected crime type by year (or by month of the year),
+    with its 95% confidence interval as error bars.
+
+    Args:
+        rates (ArrestRates): Precomputed cubes.
+        codes (list of int): Crime-type codes.
+        years (list of int): Years included, all when None.
+        unit (str): "year" or "month".
+        day_range (tuple): Inclusive (start, end) in days since 1970-01-01, or
+            None; the months it overlaps are included whole.
+
+    Returns:
+        dict: Trend chart figure.
+    """
+    by = ("crime", unit)
+    month_range = None if day_range is None else month_index(day_range)
+    result = rates.rates(by, codes=codes, years=years, month_range=month_range)
+    if unit == "year":
+        x = rates.years if years is None else rates.years[np.isin(rates.years, list(years))]
+        x = x.tolist()
+    else:
+        x = MONTH_NAMES
+
+    traces = []
+    for row, code in enumerate(codes):
+        total = result["totals"][row]
+        keep = total > 0
+        if not keep.any():
+            continue
+        name = rates.crime_types[code]
+        traces.append(figure_templates.rate_trace(
+            name,
+            legend.crime_color(name),
+            np.asarray(x, dtype=object)[keep],
+            result["rate"][row][keep],
+            result["low"][row][keep],
+            result["high"][row][keep],
+            total[keep]
+        ))
+    title = "Arrest Rate by Year" if unit == "year" else "Arrest Rate by Month"
+    return figure_templates.rate_figure(traces, title, unit.capitalize())
@@ -0,0 +1,89 @@
+"""
+bench_figures.py
+
+Construction and serialization time per request of the dashboard figures,
+built as the callbacks build them: counts from the date-range index of a
+column store written from a synthetic dataset, the map from its stored sample.
+For each chart the script reports:
+- build: time of the chart function (template copy + data arrays)
+- validate: extra time Plotly would spend turning the same figure into a go.Figure
+- json: time and size of the JSON payload sent to the browser
+For the map, the size of the partial update (dash.Patch) is reported as well.
+
+Usage:
+    python benchmarks/bench_figures.py [--rows 500000] [--repeat 20]
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import column_store  # noqa: E402
+import date_index  # noqa: E402
+import pre_process_data  # noqa: E402
+from bar_chart import create_bar_chart  # noqa: E402
+from line_chart import create_line_chart_from_counts  # noqa: E402
+from map import create_map  # noqa: E402
+from synthetic import synthetic_dataset  # noqa: E402
+
+
+def mean_time(fn, repeat: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def report(name: str, build, repeat: int, extra: str = ""):
+    build_time, fig = mean_time(build, repeat)
+    validate_time, _ = mean_time(lambda: go.Figure(fig), repeat)
+    json_time, payload = mean_time(lambda: pio.to_json(fig, validate=False), repeat)
+    print(f"{name:<22}build {build_time * 1000:8.2f} ms   validate {validate_time * 1000:8.2f} ms"
+          f"   json {json_time * 1000:7.2f} ms {len(payload) / 1024:8.1f} KiB{extra}")
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000, help="synthetic incidents")
+    parser.add_argument("--repeat", type=int, default=20, help="repetitions per measurement")
+    args = parser.parse_args()
+
+    directory = os.path.join(tempfile.mkdtemp(prefix="bench_figures_"), "store")
+    try:
+        column_store.write_store(synthetic_dataset(args.rows), directory)
+        store = column_store.ColumnStore(directory)
+        dates = date_index.DateRangeIndex(store)
+        codes = pre_process_data.select_crime_types(store, top_n=10)
+        map_df = pre_process_data.sample_map_store(store)
+        crimes = [store.crime_types[code].title() for code in codes]
+        year = int(store.years[-1])
+
+        report("bar", lambda: create_bar_chart(dates.bar_counts(None, None, codes)), args.repeat)
+        for unit in ["hour", "month", "year"]:
+            report(f"line ({unit})",
+                   lambda: create_line_chart_from_counts(dates.line_counts(unit, None, None, codes), unit),
+                   args.repeat)
+
+        fig = create_map(map_df, year, crimes)
+        patch_size = len(pio.to_json({"data": fig["data"], "title": fig["layout"]["title"]}, validate=False))
+        report("map (incl. DBSCAN)", lambda: create_map(map_df, year, crimes), max(1, args.repeat // 4),
+               f"   patch {patch_size / 1024:8.1f} KiB")
+    finally:
+        shutil.rmtree(os.path.dirname(directory), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+bench_import.py
+
+Cold import time of the dashboard modules, measured with `python -X importtime`.
+Each module is imported in a fresh interpreter, several times, and its app
+factory (create_app) is called when it has one. The script reports:
+- wall: time of the whole interpreter run
+- import: cumulative import time of the module itself
+- the heaviest top-level packages pulled in
+- whether modules that should be deferred (scikit-learn, Plotly figures,
+  requests, the legacy Dash component packages) were imported anyway
+
+Building the app must not load any data, so it is safe to run without chicago.parquet;
+the script checks that no dataset was loaded.
+
+Usage:
+    python benchmarks/bench_import.py [--modules app map sankey] [--repeat 5] [--top 10]
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+DEFERRED = ["sklearn", "plotly.express", "plotly.graph_objects", "requests",
+            "dash_html_components", "dash_core_components"]
+
+
+def statement(module: str) -> str:
+    """
+    Returns:
+        str: Code importing the module and calling its create_app, if any.
+    """
+    return f"import {module}; getattr({module}, 'create_app', lambda: None)()"
+
+
+def import_times(module: str) -> tuple:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        tuple: (wall seconds, {imported module: (self µs, cumulative µs)}).
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement(module)],
+                            cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return wall, times
+
+
+def loaded_datasets(module: str) -> list:
+    """
+    Import a module and build its app in a fresh interpreter.
+
+    Returns:
+        list of str: Datasets loaded (DashboardData built) meanwhile.
+    """
+    code = f"{statement(module)}; import dashboard_data; print(' '.join(dashboard_data.datasets.resident()))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=["app", "map", "sankey", "pre_process_data"])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=8, help="heaviest packages to list")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        walls = [wall for wall, _ in runs]
+        _, times = min(runs, key=lambda run: run[0])
+        print(f"{module:<20}wall {statistics.median(walls) * 1000:8.1f} ms"
+              f"   import {times.get(module, (0, 0))[1] / 1000:8.1f} ms   {len(times)} modules")
+
+        top_level = {name: cumulative for name, (_, cumulative) in times.items() if "." not in name and name != module}
+        for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {name:<28}{cumulative / 1000:8.1f} ms")
+        loaded = [name for name in DEFERRED if name in times]
+        print(f"    deferred modules imported: {', '.join(loaded) if loaded else 'none'}")
+        if "dashboard_data" in times:
+            datasets = loaded_datasets(module)
+            print(f"    datasets loaded: {', '.join(datasets) if datasets else 'none'}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
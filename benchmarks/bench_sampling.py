@@ -0,0 +1,110 @@
+"""
+bench_sampling.py
+
+Accuracy and speed of the map sampling strategies against full-data aggregation.
+For each strategy the script reports the sampling time and the error of the
+estimated per-(year, crime) totals and per-grid-cell counts of the selected year.
+
+Usage:
+    python benchmarks/bench_sampling.py [--rows 2000000]
+
+Uses chicago.parquet when it is available, synthetic incidents otherwise.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pre_process_data  # noqa: E402
+import sampling  # noqa: E402
+from synthetic import synthetic_dataset  # noqa: E402
+
+GRID_BINS = 40
+
+
+def load_incidents(n_rows: int) -> pd.DataFrame:
+    if os.path.exists(pre_process_data.LOCAL_FILE):
+        df = pre_process_data.load_main_dataset()
+    else:
+        df = synthetic_dataset(n_rows)
+    return df[["latitude", "longitude", "primary_type", "year"]]
+
+
+def grid_counts(df: pd.DataFrame, weights=None, bounds=None) -> np.ndarray:
+    counts, _, _ = np.histogram2d(df["latitude"], df["longitude"], bins=GRID_BINS, range=bounds, weights=weights)
+    return counts
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def report(name: str, sample: pd.DataFrame, seconds: float, df: pd.DataFrame, year: int, bounds):
+    true_totals = df.groupby(["year", "primary_type"], observed=True).size()
+    est_totals = sample.groupby(["year", "primary_type"], observed=True)["weight"].sum()
+    est_totals = est_totals.reindex(true_totals.index, fill_value=0)
+    total_err = (np.abs(est_totals - true_totals) / true_totals).max()
+
+    year_df = df[df["year"] == year]
+    year_sample = sample[sample["year"] == year]
+    true_grid = grid_counts(year_df, bounds=bounds)
+    est_grid = grid_counts(year_sample, weights=year_sample["weight"], bounds=bounds)
+    busy = true_grid >= 50
+    cell_err = np.median(np.abs(est_grid[busy] - true_grid[busy]) / true_grid[busy])
+
+    rare_year, rare_crime = true_totals.idxmin()
+    rare_kept = int(((sample["year"] == rare_year) & (sample["primary_type"] == rare_crime)).sum())
+    print(f"{name:<24}{seconds * 1000:>10.1f} ms{len(sample):>10,} rows{len(year_sample):>10,} in {year}"
+          f"   max total err {total_err:6.1%}   median cell err {cell_err:6.1%}"
+          f"   rarest stratum kept {rare_kept}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="synthetic rows when no parquet file is present")
+    args = parser.parse_args()
+
+    df = load_incidents(args.rows).dropna().reset_index(drop=True)
+    year = int(df["year"].max())
+    bounds = [[df["latitude"].min(), df["latitude"].max()], [df["longitude"].min(), df["longitude"].max()]]
+    print(f"{len(df):,} incidents, evaluating year {year}\n")
+
+    _, seconds = timed(lambda: df.groupby(["year", "primary_type"], observed=True).size())
+    print(f"{'full groupby':<24}{seconds * 1000:>10.1f} ms")
+    _, seconds = timed(lambda: grid_counts(df[df["year"] == year], bounds=bounds))
+    print(f"{'full grid histogram':<24}{seconds * 1000:>10.1f} ms\n")
+
+    def uniform():
+        sample = df.sample(n=min(len(df), 30000), random_state=42)
+        return sample.assign(weight=np.float32(len(df) / len(sample)))
+
+    sample, seconds = timed(uniform)
+    report("uniform 30k", sample, seconds, df, year, bounds)
+
+    sample, seconds = timed(lambda: sampling.stratified_sample(df, ["year", "primary_type"]))
+    report("stratified", sample, seconds, df, year, bounds)
+
+    def reservoir():
+        sampler = sampling.StratifiedReservoir(["year", "primary_type"], capacity=2000)
+        for start in range(0, len(df), 250_000):
+            sampler.update(df.iloc[start:start + 250_000])
+        return sampler.result()
+
+    sample, seconds = timed(reservoir)
+    report("reservoir (250k chunks)", sample, seconds, df, year, bounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+loadtest.py
+
+Concurrent load test of the dashboard callbacks, offline on one machine.
+The script starts server.py locally (or targets a running instance with --url),
+reads the callback graph from /_dash-layout and /_dash-dependencies, then
+replays a weighted mix of requests from concurrent simulated users:
+- page: a page load (index, layout, dependencies and the assets)
+- one entry per callback, named after its output (e.g. map-figure.figure),
+  with input values drawn from the options and ranges found in the layout
+It reports throughput, p50/p95/p99 latency and the error rate per request type.
+
+When chicago.parquet is missing, the server is started with CHICAGO_SYNTHETIC
+so that it builds its store from synthetic incidents.
+
+Usage:
+    python benchmarks/loadtest.py [--users 8] [--duration 60] [--mix map-figure.figure=4]
+    python benchmarks/loadtest.py --url http://127.0.0.1:8085 --users 32
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ASSETS = ["/assets/global.css", "/assets/chicago.jpg"]
+PAGE = "page"
+
+
+def fetch(url: str, payload: dict = None, timeout: float = 120.0) -> bytes:
+    """
+    GET the url, or POST payload as JSON.
+
+    Raises:
+        urllib.error.URLError: On connection errors and non-2xx answers.
+    """
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+def start_server(port: int, synthetic_rows: int) -> subprocess.Popen:
+    env = dict(os.environ, PORT=str(port))
+    if not os.path.exists(os.path.join(ROOT, "chicago.parquet")) and "CHICAGO_SYNTHETIC" not in env:
+        env["CHICAGO_SYNTHETIC"] = str(synthetic_rows)
+        print(f"chicago.parquet not found, using {synthetic_rows:,} synthetic incidents")
+    return subprocess.Popen([sys.executable, "server.py"], cwd=ROOT, env=env)
+
+
+def wait_ready(base: str, timeout: float, server: subprocess.Popen = None):
+    # The first start builds the column store, which can take a while
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            sys.exit(f"server exited with code {server.returncode}")
+        try:
+            fetch(base + "/_dash-layout", timeout=5)
+            return
+        except (urllib.error.URLError, OSError):
+            time.sleep(1)
+    sys.exit(f"server not ready after {timeout:.0f} s")
+
+
+def layout_components(node, found: dict) -> dict:
+    """
+    Collect the props of every component with an id in a /_dash-layout tree.
+
+    Returns:
+        dict: id -> (component type, props).
+    """
+    if isinstance(node, list):
+        for child in node:
+            layout_components(child, found)
+    elif isinstance(node, dict) and "props" in node:
+        props = node["props"]
+        if isinstance(props.get("id"), str):
+            found[props["id"]] = (node.get("type"), props)
+        layout_components(props.get("children"), found)
+    return found
+
+
+def random_value(kind: str, props: dict, rng: random.Random):
+    """
+    A value a user could give to a component: an option, a slider position or a
+    sub-range; the initial value for anything else.
+    """
+    options = props.get("options")
+    if options:
+        values = [o["value"] if isinstance(o, dict) else o for o in options]
+        if props.get("multi"):
+            return rng.sample(values, rng.randint(1, len(values)))
+        return rng.choice(values)
+    if "min" in props and "max" in props:
+        low, high = int(props["min"]), int(props["max"])
+        if kind == "RangeSlider":
+            return sorted(rng.sample(range(low, high + 1), 2)) if high > low else [low, high]
+        return rng.randint(low, high)
+    return props.get("value")
+
+
+class Callback:
+    """
+    One callback of /_dash-dependencies, able to build _dash-update-component payloads.
+    """
+
+    def __init__(self, dependency: dict, components: dict):
+        self.output = dependency["output"]
+        self.name = self.output.strip(".")
+        self.inputs = dependency["inputs"]
+        self.state = dependency.get("state", [])
+        self.components = components
+        outputs = [part.rsplit(".", 1) for part in self.output.strip(".").split("...")]
+        outputs = [{"id": i, "property": p} for i, p in outputs]
+        self.outputs = outputs[0] if len(outputs) == 1 else outputs
+
+    def _value(self, item: dict, rng: random.Random, vary: bool):
+        kind, props = self.components.get(item["id"], (None, {}))
+        if vary and item["property"] == "value":
+            return random_value(kind, props, rng)
+        return props.get(item["property"])
+
+    def payload(self, rng: random.Random) -> dict:
+        changed = rng.choice(self.inputs)
+        return {
+            "output": self.output,
+            "outputs": self.outputs,
+            "inputs": [dict(item, value=self._value(item, rng, item is changed)) for item in self.inputs],
+            "changedPropIds": [f"{changed['id']}.{changed['property']}"],
+            "state": [dict(item, value=self._value(item, rng, False)) for item in self.state],
+        }
+
+
+class Stats:
+    """
+    Thread-safe latency and error records per request type.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def add(self, name: str, seconds: float, ok: bool):
+        with self.lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            self.errors[name] = self.errors.get(name, 0) + (not ok)
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def user(base: str, mix: list, callbacks: dict, stats: Stats, stop: float, think: float, seed: int):
+    rng = random.Random(seed)
+    names, weights = zip(*mix)
+    while time.monotonic() < stop:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        ok = True
+        try:
+            if name == PAGE:
+                for path in ["/", "/_dash-layout", "/_dash-dependencies"] + ASSETS:
+                    fetch(base + path)
+            else:
+                fetch(base + "/_dash-update-component", callbacks[name].payload(rng))
+        except (urllib.error.URLError, OSError):
+            ok = False
+        stats.add(name, time.perf_counter() - start, ok)
+        if think:
+            time.sleep(rng.uniform(0, 2 * think))
+
+
+def report(stats: Stats, elapsed: float, users: int):
+    print(f"\n{users} users, {elapsed:.1f} s\n")
+    print(f"{'request':<28}{'count':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    all_latencies, all_errors = [], 0
+    for name in sorted(stats.latencies):
+        latencies = sorted(stats.latencies[name])
+        errors = stats.errors[name]
+        all_latencies += latencies
+        all_errors += errors
+        print(f"{name:<28}{len(latencies):>8}{len(latencies) / elapsed:>9.1f}"
+              + "".join(f"{percentile(latencies, q) * 1000:>10.0f}" for q in (50, 95, 99))
+              + f"{errors / len(latencies):>9.1%}")
+    if all_latencies:
+        all_latencies.sort()
+        print(f"{'total':<28}{len(all_latencies):>8}{len(all_latencies) / elapsed:>9.1f}"
+              + "".join(f"{percentile(all_latencies, q) * 1000:>10.0f}" for q in (50, 95, 99))
+              + f"{all_errors / len(all_latencies):>9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="running server to test (default: start server.py locally)")
+    parser.add_argument("--port", type=int, default=8099, help="port of the locally started server")
+    parser.add_argument("--users", type=int, default=8, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=60.0, help="test duration in seconds")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between requests of a user, in seconds")
+    parser.add_argument("--mix", action="append", default=[], metavar="NAME=WEIGHT",
+                        help=f"weight of a request type ('{PAGE}' or a callback output); default 1 each")
+    parser.add_argument("--synthetic-rows", type=int, default=500_000, help="incidents generated without chicago.parquet")
+    parser.add_argument("--startup-timeout", type=float, default=900.0, help="seconds to wait for the server")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    base = args.url.rstrip("/") if args.url else f"http://127.0.0.1:{args.port}"
+    if not args.url:
+        server = start_server(args.port, args.synthetic_rows)
+    try:
+        wait_ready(base, args.startup_timeout, server)
+        components = layout_components(json.loads(fetch(base + "/_dash-layout")), {})
+        callbacks = {}
+        for dependency in json.loads(fetch(base + "/_dash-dependencies")):
+            callback = Callback(dependency, components)
+            callbacks[callback.name] = callback
+
+        weights = dict.fromkeys([PAGE] + sorted(callbacks), 1.0)
+        for item in args.mix:
+            name, _, weight = item.partition("=")
+            if name not in weights:
+                sys.exit(f"unknown request type {name!r}, expected one of {', '.join(weights)}")
+            weights[name] = float(weight)
+        mix = [(name, weight) for name, weight in weights.items() if weight > 0]
+        print("mix: " + ", ".join(f"{name}={weight:g}" for name, weight in mix))
+
+        stats = Stats()
+        start = time.monotonic()
+        stop = start + args.duration
+        threads = [
+            threading.Thread(target=user, args=(base, mix, callbacks, stats, stop, args.think, args.seed + i))
+            for i in range(args.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report(stats, time.monotonic() - start, args.users)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+choropleth.py
+
+Police-beat and community-area choropleths.
+Boundaries are read from local GeoJSON files, which are not shipped with the
+repository. Each dataset names its own folder ("boundaries" in its spec, see
+registry.py; BOUNDARY_DIR for the default Chicago dataset), and each layer is
+enabled when its file is present there:
+
+    <folder>/police_beats.geojson      one Polygon/MultiPolygon feature per beat
+    <folder>/community_areas.geojson   one feature per community area
+
+For Chicago, both are exports of the City of Chicago Data Portal ("Boundaries -
+Police Beats (current)" and "Boundaries - Community Areas (current)", Export >
+GeoJSON). The area name is read from the first non-empty property listed in
+BOUNDARY_LAYERS. Every incident of
+the column store is assigned to a polygon once, at preprocessing:
+- identical coordinates are deduplicated first (incidents are block-level)
+- points are bucketed on a regular grid, so each polygon only tests the points
+  of the grid cells its bounding box overlaps
+- point-in-polygon is an even-odd ray test vectorized over points and edges
+The assigned incidents are saved next to the store as one sorted array of
+(crime type, area, day) keys, memory-mapped by every worker. The count of any
+crime type and area over any day range is then the distance between two
+binary searches, a prefix sum over the sorted keys, so the choropleth follows
+the year and the date-range slider without scanning incidents.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import json
+import os
+
+import numpy as np
+
+import column_store
+
+BOUNDARY_DIR = "boundaries"
+
+# Layer key → (label, GeoJSON file, properties holding the area name, by preference)
+BOUNDARY_LAYERS = {
+    "beats": ("Police beats", "police_beats.geojson", ["beat_num", "beat", "name"]),
+    "community": ("Community areas", "community_areas.geojson", ["community", "name", "area_numbe"]),
+}
+
+INDEX_GRID = 128
+
+# Upper bound of the (points x edges) matrices of the point-in-polygon test
+PIP_BLOCK = 4_000_000
+
+
+def available_layers(directory: str = BOUNDARY_DIR) -> list:
+    """
+    Args:
+        directory (str): Folder containing the GeoJSON files.
+
+    Returns:
+        list of str: Keys of BOUNDARY_LAYERS whose file is present.
+    """
+    return [key for key, (_, filename, _) in BOUNDARY_LAYERS.items()
+            if os.path.exists(os.path.join(directory, filename))]
+
+
+def _feature_rings(geometry: dict) -> list:
+    # All rings (outer and holes) of a Polygon or MultiPolygon as (n, 2) lon/lat arrays
+    if geometry is None:
+        return []
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+    return [np.asarray(ring, dtype=np.float64)[:, :2] for polygon in polygons for ring in polygon]
+
+
+def points_in_rings(lon: np.ndarray, lat: np.ndarray, rings: list) -> np.ndarray:
+    """
+    Even-odd point-in-polygon test; holes and multi-part polygons are handled
+    by counting crossings over all rings together.
+
+    Args:
+        lon, lat (np.ndarray): Points to test.
+        rings (list of np.ndarray): Closed or open (n, 2) lon/lat rings.
+
+    Returns:
+        np.ndarray: Boolean mask of the points inside.
+    """
+    starts = np.concatenate([ring for ring in rings])
+    ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+    x1, y1, x2, y2 = starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]
+    dy = np.where(y2 == y1, 1.0, y2 - y1)
+
+    inside = np.zeros(len(lon), dtype=bool)
+    step = max(1, PIP_BLOCK // max(len(x1), 1))
+    for begin in range(0, len(lon), step):
+        px = lon[begin:begin + step, None]
+        py = lat[begin:begin + step, None]
+        straddles = (y1 > py) != (y2 > py)
+        crosses = px < (x2 - x1) * (py - y1) / dy + x1
+        inside[begin:begin + step] = np.count_nonzero(straddles & crosses, axis=1) % 2 == 1
+    return inside
+
+
+class PolygonIndex:
+    """
+    Grid-bucketed spatial index assigning points to polygons.
+    """
+
+    def __init__(self, features: list, grid: int = INDEX_GRID):
+        """
+        Args:
+            features (list of dict): GeoJSON features.
+            grid (int): Number of index cells per side.
+        """
+        self.rings = [_feature_rings(feature.get("geometry")) for feature in features]
+        boxes = np.full((len(self.rings), 4), np.nan)
+        for index, rings in enumerate(self.rings):
+            if rings:
+                points = np.concatenate(rings)
+                boxes[index] = [points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max()]
+        self.boxes = boxes
+        self.extent = (np.nanmin(boxes[:, 0]), np.nanmin(boxes[:, 1]), np.nanmax(boxes[:, 2]), np.nanmax(boxes[:, 3]))
+        self.grid = grid
+
+    def _cells(self, lon, lat) -> tuple:
+        x0, y0, x1, y1 = self.extent
+        col = np.floor((lon - x0) / (x1 - x0) * self.grid).astype(np.int64)
+        row = np.floor((lat - y0) / (y1 - y0) * self.grid).astype(np.int64)
+        return np.clip(col, 0, self.grid - 1), np.clip(row, 0, self.grid - 1)
+
+    def assign(self, lat, lon) -> np.ndarray:
+        """
+        Index of the polygon containing each point.
+
+        Args:
+            lat, lon (array-like): float32 coordinates.
+
+        Returns:
+            np.ndarray: int16 polygon index per point, -1 outside every polygon.
+        """
+        lat = np.asarray(lat, dtype=np.float32)
+        lon = np.asarray(lon, dtype=np.float32)
+        # Deduplicate on the exact float32 bit patterns
+        keys = (lat.view(np.uint32).astype(np.uint64) << np.uint64(32)) | lon.view(np.uint32).astype(np.uint64)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        u_lat = (unique_keys >> np.uint64(32)).astype(np.uint32).view(np.float32).astype(np.float64)
+        u_lon = (unique_keys & np.uint64(0xFFFFFFFF)).astype(np.uint32).view(np.float32).astype(np.float64)
+
+        # Bucket the unique points by grid cell
+        col, row = self._cells(u_lon, u_lat)
+        cell = row * self.grid + col
+        order = np.argsort(cell, kind="stable")
+        cell_start = np.searchsorted(cell[order], np.arange(self.grid * self.grid), side="left")
+        cell_end = np.searchsorted(cell[order], np.arange(self.grid * self.grid), side="right")
+
+        result = np.full(len(unique_keys), -1, dtype=np.int16)
+        for index, (rings, box) in enumerate(zip(self.rings, self.boxes)):
+            if not rings:
+                continue
+            (c0, c1), (r0, r1) = self._cells(box[[0, 2]], box[[1, 3]])
+            cells = (np.arange(r0, r1 + 1)[:, None] * self.grid + np.arange(c0, c1 + 1)[None, :]).ravel()
+            candidates = np.concatenate([order[cell_start[c]:cell_end[c]] for c in cells])
+            candidates = candidates[result[candidates] == -1]
+            in_box = ((u_lon[candidates] >= box[0]) & (u_lon[candidates] <= box[2])
+                      & (u_lat[candidates] >= box[1]) & (u_lat[candidates] <= box[3]))
+            candidates = candidates[in_box]
+            if candidates.size:
+                inside = points_in_rings(u_lon[candidates], u_lat[candidates], rings)
+                result[candidates[inside]] = index
+        return result[inverse]
+
+
+class ChoroplethLayer:
+    """
+    Boundaries of one layer and its sorted (crime type, area, day) keys.
+    """
+
+    def __init__(self, key: str, store, directory: str = BOUNDARY_DIR):
+        """
+        Loads the boundaries and the cached assignment, computing it when the
+        cache is missing or older than the boundary file.
+
+        Args:
+            key (str): Key of BOUNDARY_LAYERS.
+            store (column_store.ColumnStore): Incidents to assign.
+            directory (str): Folder containing the GeoJSON files.
+        """
+        label, filename, name_fields = BOUNDARY_LAYERS[key]
+        path = os.path.join(directory, filename)
+        with open(path, encoding="utf-8") as f:
+            self.geojson = json.load(f)
+
+        self.key = key
+        self.label = label
+        features = self.geojson["features"]
+        # Plotly matches locations against feature ids
+        for index, feature in enumerate(features):
+            feature["id"] = str(index)
+        self.ids = [str(index) for index in range(len(features))]
+        self.names = [self._name(feature.get("properties") or {}, name_fields, index)
+                      for index, feature in enumerate(features)]
+
+        self.first_day, self.n_days = store.first_day, store.n_days
+        cache = os.path.join(store.directory, f"areas_{key}")
+        signature = {"boundary_mtime": os.path.getmtime(path), "rows": len(store), "features": len(features),
+                     "days": [self.first_day, self.n_days], "format": "keys"}
+        if not self._cache_matches(cache, signature):
+            # One worker computes the assignment; the others wait, then map its result
+            with column_store.build_lock(cache):
+                if not self._cache_matches(cache, signature):
+                    self._write_cache(cache, signature, store, features)
+        self.keys = np.load(f"{cache}_keys.npy", mmap_mode="r")
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Private memory of the layer; memory-mapped keys are shared and not counted.
+        """
+        return 0 if isinstance(self.keys, np.memmap) else self.keys.nbytes
+
+    @staticmethod
+    def _name(properties: dict, fields: list, index: int) -> str:
+        for field in fields:
+            if properties.get(field) not in (None, ""):
+                return str(properties[field]).title()
+        return f"Area {index}"
+
+    @staticmethod
+    def _cache_matches(cache: str, signature: dict) -> bool:
+        try:
+            with open(f"{cache}.json", encoding="utf-8") as f:
+                return json.load(f) == signature
+        except (OSError, ValueError):
+            return False
+
+    def _write_cache(self, cache: str, signature: dict, store, features: list):
+        # Each file is written under a temporary name and moved into place, keys
+        # first: a signature on disk always describes a complete keys file
+        area = PolygonIndex(features).assign(store["latitude"], store["longitude"])
+        keys = self._sorted_keys(store, area, len(features))
+        tmp = f"{cache}.tmp-{os.getpid()}"
+        with open(f"{tmp}_keys.npy", "wb") as f:
+            np.save(f, keys)
+        with open(f"{tmp}.json", "w", encoding="utf-8") as f:
+            json.dump(signature, f)
+        if os.path.exists(f"{cache}.json"):
+            os.remove(f"{cache}.json")
+        os.replace(f"{tmp}_keys.npy", f"{cache}_keys.npy")
+        os.replace(f"{tmp}.json", f"{cache}.json")
+
+    def _sorted_keys(self, store, area: np.ndarray, n_areas: int) -> np.ndarray:
+        inside = area >= 0
+        crime = np.asarray(store["crime"])[inside].astype(np.int64)
+        offset = np.asarray(store["day"])[inside].astype(np.int64) - self.first_day
+        keys = (crime * n_areas + area[inside]) * self.n_days + offset
+        keys.sort()
+        # int32 keys halve the mapped size whenever the key space allows it
+        dtype = np.int32 if len(store.crime_types) * n_areas * self.n_days < 2 ** 31 else np.int64
+        return keys.astype(dtype)
+
+    def area_counts(self, year: int, crime_codes: list, day_range: tuple = None) -> np.ndarray:
+        """
+        Args:
+            year (int): Selected year.
+            crime_codes (list of int): Crime-type codes to add up.
+            day_range (tuple): Inclusive (start, end) in days since 1970-01-01
+                (the store's 'day' column), or None for the whole year.
+
+        Returns:
+            np.ndarray: (crime type, area) counts of the selected crimes.
+        """
+        first = int(np.datetime64(f"{int(year)}-01-01", "D").astype(np.int64))
+        last = int(np.datetime64(f"{int(year) + 1}-01-01", "D").astype(np.int64)) - 1
+        if day_range is not None:
+            first, last = max(first, day_range[0]), min(last, day_range[1])
+        first, last = max(first - self.first_day, 0), min(last - self.first_day, self.n_days - 1)
+        codes = np.asarray(list(crime_codes), dtype=np.int64)
+        if first > last or not codes.size:
+            return np.zeros((len(codes), len(self.ids)), dtype=np.int32)
+
+        base = (codes[:, None] * len(self.ids) + np.arange(len(self.ids))[None, :]) * self.n_days
+        # Queries share the keys' dtype, so searchsorted never converts the mapped array
+        begin = np.searchsorted(self.keys, (base + first).astype(self.keys.dtype), side="left")
+        end = np.searchsorted(self.keys, (base + last).astype(self.keys.dtype), side="right")
+        return (end - begin).astype(np.int32)
@@ -0,0 +1,396 @@
+"""
+column_store.py
+
+Shared columnar storage of the cleaned crime dataset.
+Each column is written once as a flat .npy array (compact dtypes, categorical
+codes for the crime type) and every process maps the files read-only with
+np.load(mmap_mode='r'). The pages are shared through the OS page cache, so N
+workers cost about one copy of the data and opening the store is near-instant.
+
+Layout of a store directory:
+- meta.json: format version, source file signature (path, mtime, size), row
+  count, column dtypes, crime-type categories with their counts, the years and
+  the day span of the dataset, and the spatial grid used for the 'cell' column
+- <column>.npy: one array per column, all of the same length, rows sorted by day
+- <aggregate>.npy: arrays precomputed at build time, also memory-mapped, so
+  opening a dataset does not scan its columns:
+  - arrest_totals and arrest_counts, the incidents and arrests per
+    (crime type, year, month, cell) behind arrest_rates.py
+  - date_cum_*, the per-day prefix sums of date_index.py
+  - hour_counts, the (month, crime type, weekday, hour) tensor of heatmap.py
+  - map_sample and map_weights, the stratified map sample (row indices, weights)
+  - density_x and density_y, the Web Mercator projection of every row for density.py
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import contextlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import date_index
+import density
+import heatmap
+import sampling
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+STORE_VERSION = 6
+
+# Cells per side of the spatial grid behind the 'cell' column; its bounds are
+# those of the dataset, recorded in meta.json
+GRID_SIZE = 32
+
+# Parameters of the map sample, one stratum per (year, crime type)
+MAP_SAMPLE = {'fraction': 0.02, 'min_per_stratum': 200, 'max_per_stratum': 2000}
+
+# Column name → dtype stored on disk
+COLUMNS = {
+    'date': 'datetime64[ns]',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'year': 'int16',
+    'month': 'int8',
+    'weekday': 'int8',
+    'hour': 'int8',
+    'crime': 'int16',
+    'arrest': 'bool',
+    'day': 'int32',
+    'cell': 'int16',
+}
+
+
+def data_bounds(lat, lon) -> tuple:
+    """
+    Args:
+        lat, lon (array-like): Coordinates of the incidents.
+
+    Returns:
+        tuple: (lat_min, lat_max, lon_min, lon_max) covering every point, or a
+            unit square when there is none.
+    """
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    if not lat.size:
+        return 0.0, 1.0, 0.0, 1.0
+    lat_min, lat_max, lon_min, lon_max = lat.min(), lat.max(), lon.min(), lon.max()
+    # A small margin keeps the extreme points inside the last cells and avoids empty spans
+    lat_pad = max((lat_max - lat_min) * 1e-3, 1e-4)
+    lon_pad = max((lon_max - lon_min) * 1e-3, 1e-4)
+    return (float(lat_min - lat_pad), float(lat_max + lat_pad), float(lon_min - lon_pad), float(lon_max + lon_pad))
+
+
+def grid_cells(lat, lon, bounds: tuple, size: int = GRID_SIZE) -> np.ndarray:
+    """
+    Index of the grid cell containing each point (row-major, points outside are clamped).
+
+    Args:
+        lat, lon (array-like): Coordinates.
+        bounds (tuple): (lat_min, lat_max, lon_min, lon_max) of the grid.
+        size (int): Number of cells per side.
+
+    Returns:
+        np.ndarray: Cell index of each point, in [0, size * size).
+    """
+    lat_min, lat_max, lon_min, lon_max = bounds
+    row = np.clip(((np.asarray(lat) - lat_min) / (lat_max - lat_min) * size).astype(np.int64), 0, size - 1)
+    col = np.clip(((np.asarray(lon) - lon_min) / (lon_max - lon_min) * size).astype(np.int64), 0, size - 1)
+    return row * size + col
+
+
+def source_signature(source: str) -> dict:
+    """
+    Args:
+        source (str): Source file of a store (parquet or CSV), or None.
+
+    Returns:
+        dict: {"path", "mtime", "size"} of the file, or None if there is no such file.
+    """
+    if source is None or not os.path.exists(source):
+        return None
+    stat = os.stat(source)
+    return {'path': os.path.abspath(source), 'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def is_valid(directory: str, source: str = None) -> bool:
+    """
+    Args:
+        directory (str): Store directory.
+        source (str): Source file the store was built from. When the file exists,
+            the store is only valid if it was built from this very version of it,
+            so a refreshed snapshot triggers a rebuild.
+
+    Returns:
+        bool: True if the directory holds a complete, up-to-date store of the current version.
+    """
+    try:
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    signature = source_signature(source)
+    if signature is not None and meta.get('source') != signature:
+        return False
+    names = list(meta.get('columns', {})) + list(meta.get('aggregates', {}))
+    return meta.get('version') == STORE_VERSION and all(
+        os.path.exists(os.path.join(directory, f"{name}.npy")) for name in names
+    )
+
+
+@contextlib.contextmanager
+def build_lock(directory: str):
+    """
+    Exclusive lock of the builders of a store, across processes (e.g. gunicorn
+    workers starting together). Builders re-check is_valid once they hold it.
+
+    Args:
+        directory (str): Store directory; the lock file is <directory>.lock.
+    """
+    with open(f"{directory}.lock", 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after 10 seconds; keep waiting for the other builder
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def arrest_cubes(arrays: dict, n_crimes: int, years: np.ndarray) -> dict:
+    """
+    Incidents and arrests per (crime type, year, month, cell), one np.bincount each.
+
+    Args:
+        arrays (dict): Columns 'crime', 'year', 'month', 'cell' and 'arrest'.
+        n_crimes (int): Number of crime-type codes.
+        years (np.ndarray): Sorted years of the dataset.
+
+    Returns:
+        dict: 'arrest_totals' and 'arrest_counts' int32 arrays of shape
+            (crime types, years, 12, GRID_SIZE ** 2).
+    """
+    n_years, n_cells = len(years), GRID_SIZE ** 2
+    flat = np.asarray(arrays['crime'], dtype=np.int64) * n_years + np.searchsorted(years, arrays['year'])
+    flat = (flat * 12 + np.asarray(arrays['month'], dtype=np.int64) - 1) * n_cells + arrays['cell']
+    shape = (n_crimes, n_years, 12, n_cells)
+    size = n_crimes * n_years * 12 * n_cells
+    arrested = np.asarray(arrays['arrest'], dtype=bool)
+    return {
+        'arrest_totals': np.bincount(flat, minlength=size).astype(np.int32).reshape(shape),
+        'arrest_counts': np.bincount(flat[arrested], minlength=size).astype(np.int32).reshape(shape),
+    }
+
+
+def map_sample(arrays: dict, n_crimes: int) -> dict:
+    """
+    Stratified map sample with one stratum per (year, crime type), see sampling.stratified_indices.
+
+    Args:
+        arrays (dict): Columns 'year' and 'crime'.
+        n_crimes (int): Number of crime-type codes.
+
+    Returns:
+        dict: 'map_sample', the sorted int64 row indices, and 'map_weights', their float32 weights.
+    """
+    year = np.asarray(arrays['year'], dtype=np.int64)
+    first_year = int(year.min()) if len(year) else 0
+    group_ids = (year - first_year) * n_crimes + arrays['crime']
+    selected, weights = sampling.stratified_indices(group_ids, random_state=42, **MAP_SAMPLE)
+    return {'map_sample': selected.astype(np.int64), 'map_weights': weights}
+
+
+def build_aggregates(arrays: dict, n_crimes: int, years: np.ndarray) -> dict:
+    """
+    Args:
+        arrays (dict): Every column of the store, rows sorted by day.
+        n_crimes (int): Number of crime-type codes.
+        years (np.ndarray): Sorted years of the dataset.
+
+    Returns:
+        dict: Name → array of every aggregate saved with the store.
+    """
+    aggregates = arrest_cubes(arrays, n_crimes, years)
+    aggregates.update(date_index.prefix_sums(arrays, n_crimes, GRID_SIZE ** 2))
+    aggregates['hour_counts'] = heatmap.month_hour_counts(arrays, n_crimes)
+    aggregates.update(map_sample(arrays, n_crimes))
+    x, y = density.mercator(arrays['latitude'], arrays['longitude'])
+    aggregates['density_x'], aggregates['density_y'] = x.astype(np.float32), y.astype(np.float32)
+    return aggregates
+
+
+def write_store(df: pd.DataFrame, directory: str, source: str = None):
+    """
+    Write the cleaned dataset as flat column files.
+
+    Rows are sorted by day, so date ranges are contiguous slices of every column.
+    The store is written to a temporary directory and moved into place at the
+    end, so readers never observe a partially written store. Callers hold
+    build_lock. A previous store is renamed away rather than deleted in place:
+    processes that mapped it keep reading its files until they reopen the store.
+
+    Args:
+        df (pd.DataFrame): Output of pre_process_data.load_main_dataset.
+        directory (str): Destination directory.
+        source (str): Source file of df, recorded for is_valid; None for generated data.
+    """
+    crime = df['primary_type'].astype('category').cat.remove_unused_categories()
+    dates = df['date']
+    bounds = data_bounds(df['latitude'].to_numpy(), df['longitude'].to_numpy())
+    arrays = {
+        'date': dates.to_numpy(dtype='datetime64[ns]'),
+        'latitude': df['latitude'].to_numpy(),
+        'longitude': df['longitude'].to_numpy(),
+        'year': df['year'].to_numpy(),
+        'month': dates.dt.month.to_numpy(),
+        'weekday': dates.dt.dayofweek.to_numpy(),
+        'hour': dates.dt.hour.to_numpy(),
+        'crime': crime.cat.codes.to_numpy(),
+        'arrest': df['arrest'].to_numpy(),
+        # Days since 1970-01-01
+        'day': dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64),
+        'cell': grid_cells(df['latitude'].to_numpy(), df['longitude'].to_numpy(), bounds),
+    }
+    order = np.argsort(arrays['day'], kind='stable')
+    arrays = {name: np.ascontiguousarray(values)[order] for name, values in arrays.items()}
+
+    tmp = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, dtype in COLUMNS.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(arrays[name], dtype=dtype))
+
+    years = np.unique(arrays['year'])
+    aggregates = build_aggregates(arrays, len(crime.cat.categories), years)
+    for name, counts in aggregates.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), counts)
+
+    meta = {
+        'version': STORE_VERSION,
+        'source': source_signature(source),
+        'rows': len(df),
+        'columns': COLUMNS,
+        'crime_types': [str(c) for c in crime.cat.categories],
+        'crime_counts': np.bincount(arrays['crime'], minlength=len(crime.cat.categories)).tolist(),
+        'years': [int(year) for year in years],
+        # First day (days since 1970-01-01) and number of days covered
+        'days': [int(arrays['day'][0]), int(arrays['day'][-1] - arrays['day'][0]) + 1] if len(df) else [0, 1],
+        'aggregates': {name: str(counts.dtype) for name, counts in aggregates.items()},
+        'grid': {'bounds': list(bounds), 'size': GRID_SIZE},
+    }
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    old = f"{directory}.old-{os.getpid()}"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, old)
+    os.rename(tmp, directory)
+    # Unlinking mapped files is safe on POSIX; on Windows they stay until unmapped
+    shutil.rmtree(old, ignore_errors=True)
+
+
+class ColumnStore:
+    """
+    Read-only view of a store directory; columns and aggregates are memory-mapped on open.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): Store directory written by write_store.
+        """
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.directory = directory
+        self.columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+            for name in self.meta['columns']
+        }
+        self.aggregates = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+            for name in self.meta['aggregates']
+        }
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __len__(self) -> int:
+        return self.meta['rows']
+
+    @property
+    def crime_types(self) -> list:
+        """
+        Returns:
+            list of str: Crime-type names indexed by the codes of the 'crime' column.
+        """
+        return self.meta['crime_types']
+
+    @property
+    def crime_counts(self) -> list:
+        """
+        Returns:
+            list of int: Number of incidents of each crime type, indexed by code.
+        """
+        return self.meta['crime_counts']
+
+    @property
+    def years(self) -> list:
+        """
+        Returns:
+            list of int: Sorted years of the dataset, indexing the year axis of the aggregates.
+        """
+        return self.meta['years']
+
+    @property
+    def first_day(self) -> int:
+        """
+        Returns:
+            int: Day of the earliest incident, as days since 1970-01-01.
+        """
+        return self.meta['days'][0]
+
+    @property
+    def n_days(self) -> int:
+        """
+        Returns:
+            int: Number of days from the earliest to the latest incident.
+        """
+        return self.meta['days'][1]
+
+    @property
+    def grid(self) -> tuple:
+        """
+        Returns:
+            tuple: (bounds, size) of the spatial grid behind the 'cell' column.
+        """
+        grid = self.meta['grid']
+        return tuple(grid['bounds']), grid['size']
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Size of the mapped columns (shared between processes).
+        """
+        return sum(arr.nbytes for arr in self.columns.values())
@@ -0,0 +1,146 @@
+"""
+dashboard_data.py
+
+Data behind the dashboard layout and callbacks, loaded on first use.
+Building the Dash app (app.create_app) never touches the data: the layout
+function and the callbacks call get(name), which returns the data of a
+dataset from the registry (see registry.py), loading it once per process;
+concurrent first callers wait for the same load.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import arrest_rates
+import choropleth
+import density
+import heatmap
+import pre_process_data
+import registry
+
+
+class DashboardData:
+    """
+    Column store, indexes and precomputed views shared by the callbacks.
+    """
+
+    def __init__(self, spec: dict):
+        """
+        Args:
+            spec (dict): Dataset spec from registry.load_specs.
+        """
+        years = tuple(spec["years"]) if spec.get("years") else None
+        df_dic = pre_process_data.preprocess_dashboard(spec["source"], spec.get("url"), years)
+        self.label = spec["label"]
+        self.boundaries = spec.get("boundaries")
+
+        self.store = df_dic["store"]
+        self.date_idx = df_dic["dates"]
+        self.full_range = [0, self.date_idx.n_days - 1]
+        first_year, last_year = int(str(self.date_idx.dates[0])[:4]), int(str(self.date_idx.dates[-1])[:4])
+        self.date_marks = {
+            self.date_idx.offset(f"{year}-01-01"): str(year)
+            for year in range(first_year, last_year + 1)
+            if 0 <= self.date_idx.offset(f"{year}-01-01") < self.date_idx.n_days
+        }
+
+        # Every crime type is kept; charts show a selection made at request time (top 10 by default)
+        self.crime_names = [name.title() for name in self.store.crime_types]
+        self.crime_codes = {name: code for code, name in enumerate(self.crime_names)}
+        self.crime_options = [
+            {"label": f"{self.crime_names[code]} ({self.store.crime_counts[code]:,})", "value": code}
+            for code in pre_process_data.select_crime_types(self.store)
+        ]
+        self.default_codes = pre_process_data.select_crime_types(self.store, top_n=10)
+
+        self.map_df = df_dic["map"]
+        self.map_df['primary_type'] = self.map_df['primary_type'].astype(str).str.title()
+        self.year_options = list(self.store.years)
+        self.default_year = max(self.year_options)
+
+        # Density tiles are rendered from every incident of the store, not from the map sample
+        self.density_renderer = density.DensityRenderer(self.store)
+
+        # Weekday × hour and month × hour counts per year and crime type
+        self.hour_histogram = heatmap.HourHistogram(self.store)
+
+        # Arrests and incidents per (crime type, year, month, grid cell), mapped from the store
+        self.arrest_rates = arrest_rates.ArrestRates(self.store)
+
+        # Initial map view: from the spec, else the middle of the dataset's grid
+        lat_min, lat_max, lon_min, lon_max = self.store.grid[0]
+        self.map_view = {
+            "center": spec.get("center") or {"lat": (lat_min + lat_max) / 2, "lon": (lon_min + lon_max) / 2},
+            "zoom": spec.get("zoom", 10),
+        }
+
+        # Boundaries come from the dataset's own directory; area assignments are
+        # computed once and cached next to the store
+        self.choropleth_layers = {
+            key: choropleth.ChoroplethLayer(key, self.store, self.boundaries)
+            for key in (choropleth.available_layers(self.boundaries) if self.boundaries else [])
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Private memory of the dataset; the memory-mapped store is shared and not counted.
+        """
+        return (int(self.map_df.memory_usage(deep=True).sum()) + self.date_idx.nbytes
+                + self.density_renderer.nbytes + self.hour_histogram.nbytes + self.arrest_rates.nbytes
+                + sum(layer.nbytes for layer in self.choropleth_layers.values()))
+
+    def codes(self, codes) -> list:
+        """
+        Args:
+            codes (list of int): Crime-type codes from the selection dropdown.
+
+        Returns:
+            list of int: The codes that exist in this dataset (the selection may
+                still hold codes of the previously selected dataset).
+        """
+        return [code for code in (codes or []) if 0 <= code < len(self.crime_names)]
+
+    def selected_crimes(self, codes) -> list:
+        """
+        Args:
+            codes (list of int): Crime-type codes from the selection dropdown.
+
+        Returns:
+            list of str: Names of the selected crime types, sorted.
+        """
+        return sorted(self.crime_names[code] for code in self.codes(codes))
+
+
+class LayoutPlaceholder:
+    """
+    Stand-in for DashboardData when the layout is built outside a request, for
+    Dash's callback validation: same attributes, no data.
+    """
+
+    label = ""
+    boundaries = None
+    map_view = None
+    full_range = [0, 1]
+    date_marks = {}
+    crime_options = []
+    default_codes = []
+    year_options = []
+    default_year = None
+    choropleth_layers = {}
+
+
+datasets = registry.DatasetRegistry(registry.load_specs(), DashboardData)
+
+
+def get(name: str = None) -> DashboardData:
+    """
+    Args:
+        name (str): Dataset name, None for the default dataset.
+
+    Returns:
+        DashboardData: The data of that dataset, loaded on first use.
+    """
+    return datasets.get(name)
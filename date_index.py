@@ -0,0 +1,294 @@
+"""
+date_index.py
+
+Prefix-sum count arrays answering arbitrary date-range queries.
+Per-day counts are accumulated once, when the column store is written
+(prefix_sums), and memory-mapped with it:
+- by crime type and arrest flag
+- by crime type and hour of day
+- by crime type and period (weekday / weekend)
+- by spatial grid cell
+The counts of any [start, end] range are then the difference of two lookups,
+so moving the date slider never scans the incident rows.
+
+Days are addressed by their offset from the first day of the dataset.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+RESOLUTIONS = ['Not Arrested', 'Arrested']
+PERIODS = ['Weekday', 'Weekend']
+
+
+def _prefix(counts: np.ndarray) -> np.ndarray:
+    # Row i holds the counts of days [0, i)
+    cum = np.zeros((counts.shape[0] + 1,) + counts.shape[1:], dtype=np.int32)
+    np.cumsum(counts, axis=0, dtype=np.int32, out=cum[1:])
+    return cum
+
+
+def prefix_sums(columns, n_crimes: int, n_cells: int) -> dict:
+    """
+    Cumulative per-day counts of a dataset, saved as column store aggregates.
+
+    Args:
+        columns (dict): 'day', 'crime', 'arrest', 'hour' and 'cell' arrays.
+        n_crimes (int): Number of crime-type codes.
+        n_cells (int): Number of spatial grid cells.
+
+    Returns:
+        dict: int32 'date_cum_arrest' (days + 1, crime types, 2), 'date_cum_hour'
+            (days + 1, crime types, 24), 'date_cum_period' (days + 1, crime types, 2)
+            and 'date_cum_cell' (days + 1, cells); row i holds days [0, i).
+    """
+    day = np.asarray(columns['day'], dtype=np.int64)
+    first_day = int(day.min()) if len(day) else 0
+    n_days = int(day.max()) - first_day + 1 if len(day) else 1
+
+    offset = day - first_day
+    base = offset * n_crimes + columns['crime']
+    by_arrest = np.bincount(base * 2 + columns['arrest'], minlength=n_days * n_crimes * 2)
+    by_arrest = by_arrest.reshape(n_days, n_crimes, 2)
+    by_hour = np.bincount(base * 24 + columns['hour'], minlength=n_days * n_crimes * 24)
+    by_hour = by_hour.reshape(n_days, n_crimes, 24)
+    by_cell = np.bincount(offset * n_cells + columns['cell'], minlength=n_days * n_cells)
+    by_cell = by_cell.reshape(n_days, n_cells)
+
+    # Each day falls in a single period, so the per-period counts are the daily totals moved to one slot
+    daily = by_arrest.sum(axis=2)
+    weekend = (first_day + np.arange(n_days) + 3) % 7 >= 5
+    by_period = np.zeros((n_days, n_crimes, 2), dtype=np.int64)
+    by_period[np.arange(n_days), :, weekend.astype(np.int64)] = daily
+
+    return {
+        'date_cum_arrest': _prefix(by_arrest),
+        'date_cum_hour': _prefix(by_hour),
+        'date_cum_period': _prefix(by_period),
+        'date_cum_cell': _prefix(by_cell),
+    }
+
+
+class DateRangeIndex:
+    """
+    Cumulative per-day counts of a column_store.ColumnStore.
+    """
+
+    def __init__(self, store):
+        """
+        Args:
+            store (column_store.ColumnStore): Store with the prefix_sums aggregates.
+        """
+        self.first_day = store.first_day
+        self.crime_types = [c.title() for c in store.crime_types]
+        self._cum_arrest = store.aggregates['date_cum_arrest']
+        self._cum_hour = store.aggregates['date_cum_hour']
+        self._cum_period = store.aggregates['date_cum_period']
+        self._cum_cell = store.aggregates['date_cum_cell']
+        self.n_days = len(self._cum_arrest) - 1
+        # Small (days x crime types); kept in private memory
+        self._cum_total = np.asarray(self._cum_arrest).sum(axis=2, dtype=np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Private memory of the cumulative arrays; memory-mapped ones are shared and not counted.
+        """
+        return sum(0 if isinstance(cum, np.memmap) else cum.nbytes
+                   for cum in (self._cum_arrest, self._cum_hour, self._cum_period, self._cum_cell, self._cum_total))
+
+    # ===== Day addressing =====
+
+    @property
+    def dates(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: datetime64[D] date of every day offset.
+        """
+        return EPOCH + self.first_day + np.arange(self.n_days)
+
+    def offset(self, date) -> int:
+        """
+        Args:
+            date (str or datetime-like): A calendar day.
+
+        Returns:
+            int: Offset of that day (may fall outside the dataset).
+        """
+        return int((np.datetime64(pd.Timestamp(date).date(), 'D') - EPOCH).astype(np.int64)) - self.first_day
+
+    def absolute_days(self, start: int, end: int) -> tuple:
+        """
+        Args:
+            start, end (int): Inclusive range of day offsets.
+
+        Returns:
+            tuple: The same range as days since 1970-01-01 (the store's 'day' column).
+        """
+        return start + self.first_day, end + self.first_day
+
+    def _bounds(self, start, end) -> tuple:
+        start = 0 if start is None else max(int(start), 0)
+        end = self.n_days - 1 if end is None else min(int(end), self.n_days - 1)
+        if start > end:
+            return 0, 0
+        return start, end + 1
+
+    # ===== Range queries (two lookups each) =====
+
+    def arrest_counts(self, start=None, end=None) -> np.ndarray:
+        """
+        Args:
+            start, end (int): Inclusive range of day offsets (None for open ends).
+
+        Returns:
+            np.ndarray: (crime type, arrest flag) counts.
+        """
+        s, e = self._bounds(start, end)
+        return self._cum_arrest[e] - self._cum_arrest[s]
+
+    def hour_counts(self, start=None, end=None) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (crime type, hour) counts of the range.
+        """
+        s, e = self._bounds(start, end)
+        return self._cum_hour[e] - self._cum_hour[s]
+
+    def period_counts(self, start=None, end=None) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (crime type, weekday/weekend) counts of the range.
+        """
+        s, e = self._bounds(start, end)
+        return self._cum_period[e] - self._cum_period[s]
+
+    def cell_counts(self, start=None, end=None) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Counts of every spatial grid cell (all crime types).
+        """
+        s, e = self._bounds(start, end)
+        return self._cum_cell[e] - self._cum_cell[s]
+
+    def type_counts(self, start=None, end=None) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Counts of every crime type in the range.
+        """
+        s, e = self._bounds(start, end)
+        return self._cum_total[e] - self._cum_total[s]
+
+    def _calendar_periods(self, unit: str, start, end) -> tuple:
+        # Boundaries of the calendar months or years intersecting [start, end], clipped to it
+        s, e = self._bounds(start, end)
+        dates = self.dates
+        first = dates[s].astype(f'datetime64[{unit}]')
+        last = dates[max(e - 1, s)].astype(f'datetime64[{unit}]')
+        periods = np.arange(first, last + 1)
+        edges = np.append(periods, last + 1).astype('datetime64[D]')
+        edges = np.clip((edges - EPOCH).astype(np.int64) - self.first_day, s, e)
+        counts = np.diff(self._cum_total[edges], axis=0)
+        return periods, counts
+
+    # ===== Chart inputs =====
+
+    def _select(self, codes) -> np.ndarray:
+        # Crime-type codes to report, all types when codes is None
+        return np.arange(len(self.crime_types)) if codes is None else np.asarray(list(codes), dtype=np.int64)
+
+    def bar_counts(self, start=None, end=None, codes=None) -> pd.DataFrame:
+        """
+        Input of bar_chart.create_bar_chart for a date range.
+
+        Args:
+            start, end (int): Inclusive range of day offsets.
+            codes (list of int): Crime types to include, all when None.
+
+        Returns:
+            pd.DataFrame: Columns 'Period', 'Crime_Type' and 'Count'.
+        """
+        selected = self._select(codes)
+        counts = self.period_counts(start, end)[selected]
+        return pd.DataFrame({
+            'Period': np.repeat(PERIODS, len(selected)),
+            'Crime_Type': np.tile(np.asarray(self.crime_types)[selected], len(PERIODS)),
+            'Count': counts.T.ravel(),
+        })
+
+    def sankey_counts(self, start=None, end=None, codes=None) -> pd.DataFrame:
+        """
+        Input of sankey.create_sankey_from_counts for a date range.
+        Crime types without incidents in the range are left out.
+
+        Args:
+            start, end (int): Inclusive range of day offsets.
+            codes (list of int): Crime types to include, all when None.
+
+        Returns:
+            pd.DataFrame: Columns 'Crime_Type', 'Resolution' and 'Count'.
+        """
+        selected = self._select(codes)
+        counts = self.arrest_counts(start, end)[selected]
+        present = counts.sum(axis=1) > 0
+        crimes = np.asarray(self.crime_types)[selected][present]
+        return pd.DataFrame({
+            'Crime_Type': np.repeat(crimes, 2),
+            'Resolution': np.tile(RESOLUTIONS, len(crimes)),
+            'Count': counts[present].ravel(),
+        })
+
+    def line_counts(self, time_unit: str, start=None, end=None, codes=None) -> pd.DataFrame:
+        """
+        Input of line_chart.create_line_chart_from_counts for a date range.
+
+        Hours and months are averaged over the calendar years overlapping the
+        range, years are totals.
+
+        Args:
+            time_unit (str): One of ["hour", "month", "year"].
+            start, end (int): Inclusive range of day offsets.
+            codes (list of int): Crime types to include, all when None.
+
+        Returns:
+            pd.DataFrame: Columns time_unit, 'crime_grouped' and 'count'.
+        """
+        if time_unit == 'hour':
+            years, _ = self._calendar_periods('Y', start, end)
+            s, e = self._bounds(start, end)
+            per_year = []
+            for year in years:
+                year_start = self.offset(str(year) + '-01-01')
+                year_end = self.offset(str(year + 1) + '-01-01') - 1
+                per_year.append(self.hour_counts(max(s, year_start), min(e - 1, year_end)))
+            values = np.mean(per_year, axis=0).T
+            keys = np.arange(24)
+        elif time_unit == 'month':
+            months, counts = self._calendar_periods('M', start, end)
+            month_number = months.astype(np.int64) % 12
+            n_years = np.bincount(month_number, minlength=12)
+            values = np.zeros((12, len(self.crime_types)))
+            np.add.at(values, month_number, counts)
+            present = n_years > 0
+            values = values[present] / n_years[present, None]
+            keys = np.arange(1, 13)[present]
+        else:
+            years, values = self._calendar_periods('Y', start, end)
+            keys = years.astype(np.int64) + 1970
+
+        selected = self._select(codes)
+        values = np.asarray(values, dtype=float).reshape(len(keys), len(self.crime_types))[:, selected]
+        frame = pd.DataFrame({
+            time_unit: np.repeat(keys, len(selected)),
+            'crime_grouped': np.tile(np.asarray(self.crime_types)[selected], len(keys)),
+            'count': values.ravel(),
+        })
+        # Crime types absent from the range get no trace
+        totals = frame.groupby('crime_grouped')['count'].transform('sum')
+        return frame[totals > 0].reset_index(drop=True)
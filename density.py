@@ -0,0 +1,224 @@
+"""
+density.py
+
+Server-side density rendering of every incident, independent of map sampling.
+Points of the selected year, date range and crime types are binned into a 2D
+histogram with NumPy, log-scaled and colormapped into PNG XYZ raster tiles (Web
+Mercator, 256 px) served by a Flask route. Rendered tiles are kept in an LRU
+cache keyed by (year, date range, crime set, z, x, y), so the payload stays
+constant whatever the number of incidents.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import math
+import struct
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+TILE_SIZE = 256
+TILE_CACHE_SIZE = 2048
+
+# Zoom level at which the color scale is calibrated on the whole city
+REFERENCE_ZOOM = 11
+
+# Color stops (position, RGBA) from sparse to dense pixels
+COLOR_STOPS = [
+    (0.0, (255, 255, 178, 0)),
+    (0.15, (254, 204, 92, 140)),
+    (0.4, (253, 141, 60, 190)),
+    (0.7, (240, 59, 32, 220)),
+    (1.0, (189, 0, 38, 240)),
+]
+
+
+def build_colormap(stops=COLOR_STOPS) -> np.ndarray:
+    """
+    Interpolate color stops into a lookup table.
+
+    Args:
+        stops (list): (position in [0, 1], (r, g, b, a)) pairs.
+
+    Returns:
+        np.ndarray: (256, 4) uint8 RGBA table.
+    """
+    positions = np.array([p for p, _ in stops])
+    colors = np.array([c for _, c in stops], dtype=float)
+    levels = np.linspace(0.0, 1.0, 256)
+    table = np.stack([np.interp(levels, positions, colors[:, i]) for i in range(4)], axis=1)
+    return table.round().astype(np.uint8)
+
+
+COLORMAP = build_colormap()
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """
+    Encode an RGBA image as PNG without any imaging dependency.
+
+    Args:
+        rgba (np.ndarray): (height, width, 4) uint8 image.
+
+    Returns:
+        bytes: PNG file content.
+    """
+    height, width, _ = rgba.shape
+    # Every scanline starts with filter type 0 (None)
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b""))
+
+
+def mercator(lat, lon) -> tuple:
+    """
+    Project coordinates to normalized Web Mercator (x and y in [0, 1], y pointing south).
+
+    Args:
+        lat, lon (array-like): Coordinates in degrees.
+
+    Returns:
+        tuple: (x, y) float64 arrays.
+    """
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -85.0511, 85.0511))
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0
+    return x, y
+
+
+def colorize(counts: np.ndarray, reference: float) -> np.ndarray:
+    """
+    Map counts to RGBA with a log scale; empty pixels are transparent.
+
+    Args:
+        counts (np.ndarray): (height, width) pixel counts.
+        reference (float): Count mapped to the top of the colormap.
+
+    Returns:
+        np.ndarray: (height, width, 4) uint8 image.
+    """
+    level = np.log1p(counts) / math.log1p(max(reference, 1.0))
+    index = np.clip((level * 255).astype(np.int64), 0, 255)
+    image = COLORMAP[index]
+    image[counts == 0] = 0
+    return image
+
+
+class DensityRenderer:
+    """
+    Renders density tiles from a column_store.ColumnStore.
+
+    Projected coordinates are saved with the store, whose rows are sorted by
+    day, so a request only touches the rows of its year and date range.
+    """
+
+    def __init__(self, store, cache_size: int = TILE_CACHE_SIZE):
+        """
+        Args:
+            store (column_store.ColumnStore): Store with 'day' and 'crime' columns
+                and the 'density_x' and 'density_y' aggregates.
+            cache_size (int): Number of rendered tiles kept in the LRU cache.
+        """
+        self._day = store['day']
+        self._x = store.aggregates['density_x']
+        self._y = store.aggregates['density_y']
+        self._crime = store['crime']
+
+        grid_bounds, _ = store.grid
+        lat_min, lat_max, lon_min, lon_max = grid_bounds
+        self.bounds = grid_bounds
+        (self._x0, self._x1), (self._y1, self._y0) = mercator([lat_min, lat_max], [lon_min, lon_max])
+
+        # Per-instance caches, released with the renderer when its dataset is evicted
+        self.tile = lru_cache(maxsize=cache_size)(self._render_tile)
+        self.reference = lru_cache(maxsize=256)(self._reference)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Private memory of the projected coordinates, 0 when memory-mapped
+                (rendered tiles not included).
+        """
+        return sum(0 if isinstance(arr, np.memmap) else arr.nbytes
+                   for arr in (self._x, self._y, self._crime, self._day))
+
+    def _points(self, year: int, crimes: tuple, day_range: tuple) -> tuple:
+        first = int(np.datetime64(f"{int(year)}-01-01", "D").astype(np.int64))
+        last = int(np.datetime64(f"{int(year) + 1}-01-01", "D").astype(np.int64)) - 1
+        if day_range is not None:
+            first, last = max(first, day_range[0]), min(last, day_range[1])
+        # Scalars of the column's dtype keep searchsorted from converting the array
+        begin = np.searchsorted(self._day, self._day.dtype.type(first), side='left')
+        end = np.searchsorted(self._day, self._day.dtype.type(last), side='right') if first <= last else begin
+        part = slice(begin, max(begin, end))
+        x, y = self._x[part], self._y[part]
+        if crimes is not None:
+            keep = np.isin(self._crime[part], crimes)
+            x, y = x[keep], y[keep]
+        return x, y
+
+    @staticmethod
+    def _histogram(x, y, x0, y0, span_x, span_y, width, height) -> np.ndarray:
+        col = np.floor((x - x0) / span_x * width).astype(np.int64)
+        row = np.floor((y - y0) / span_y * height).astype(np.int64)
+        inside = (col >= 0) & (col < width) & (row >= 0) & (row < height)
+        return np.bincount(row[inside] * width + col[inside], minlength=width * height).reshape(height, width)
+
+    def _reference(self, year: int, crimes: tuple, day_range: tuple = None) -> float:
+        """
+        Count mapped to the top of the color scale at REFERENCE_ZOOM, shared by
+        all tiles of a (year, date range, crime set) so that adjacent tiles match.
+
+        Args:
+            year (int): Selected year.
+            crimes (tuple of int): Crime-type codes, or None for all types.
+            day_range (tuple): Inclusive (start, end) in days since 1970-01-01, or None.
+
+        Returns:
+            float: 99.9th percentile of the non-empty pixel counts.
+        """
+        x, y = self._points(year, crimes, day_range)
+        scale = TILE_SIZE * 2 ** REFERENCE_ZOOM
+        width = max(int((self._x1 - self._x0) * scale), 1)
+        height = max(int((self._y1 - self._y0) * scale), 1)
+        counts = self._histogram(x, y, self._x0, self._y0, self._x1 - self._x0, self._y1 - self._y0, width, height)
+        nonzero = counts[counts > 0]
+        return float(np.percentile(nonzero, 99.9)) if nonzero.size else 1.0
+
+    def _render_tile(self, year: int, crimes: tuple, day_range: tuple, z: int, x: int, y: int) -> bytes:
+        points_x, points_y = self._points(year, crimes, day_range)
+        span = 1.0 / 2 ** z
+        counts = self._histogram(points_x, points_y, x * span, y * span, span, span, TILE_SIZE, TILE_SIZE)
+        # A pixel covers 4 times less ground per zoom level
+        reference = self.reference(year, crimes, day_range) / 4.0 ** (z - REFERENCE_ZOOM)
+        return encode_png(colorize(counts, reference))
+
+
+def tile_layer(url_template: str, opacity: float = 0.85) -> dict:
+    """
+    Mapbox raster layer reading XYZ tiles.
+
+    Args:
+        url_template (str): Tile URL containing {z}, {x} and {y}.
+        opacity (float): Layer opacity.
+
+    Returns:
+        dict: Mapbox layer.
+    """
+    return {
+        "sourcetype": "raster",
+        "source": [url_template],
+        "sourceattribution": "Chicago Data Portal",
+        "opacity": opacity,
+        "below": "traces",
+    }
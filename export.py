@@ -0,0 +1,239 @@
+"""
+export.py
+
+Streaming export of the incidents matching the dashboard filters.
+Rows are read from the memory-mapped column store slice by slice, filtered
+with NumPy and turned into Arrow record batches, which are written as CSV or
+Parquet into a small in-memory sink drained after every batch. The response
+is therefore a generator: memory stays flat whatever the export size, the
+first bytes leave as soon as the first batch is ready, and the WSGI server
+only asks for the next batch once the previous one has been sent.
+
+The number of matching rows is previewed from the prefix-sum index
+(date_index.DateRangeIndex), without scanning the store.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Rows scanned per slice of the store
+SCAN_ROWS = 1_000_000
+
+# Target size of each chunk sent to the client; small enough to keep the
+# pipe busy without buffering, large enough to amortize per-batch overhead
+CHUNK_BYTES = 1 << 20
+
+# Approximate size of one exported row, per format
+ROW_BYTES = {"csv": 80, "parquet": 24}
+
+EXPORT_COLUMNS = ["date", "primary_type", "arrest", "latitude", "longitude", "year", "month", "weekday", "hour"]
+
+
+class ExportFilters:
+    """
+    Row filters of an export, as sent by the dashboard.
+    """
+
+    def __init__(self, day_range: tuple = None, years: list = None, codes: list = None, bounds: tuple = None):
+        """
+        Args:
+            day_range (tuple): Inclusive (start, end) in days since 1970-01-01, or None.
+            years (list of int): Years to keep, or None for all.
+            codes (list of int): Crime-type codes to keep, or None for all.
+            bounds (tuple): (lat_min, lat_max, lon_min, lon_max), or None.
+        """
+        self.day_range = day_range
+        self.years = years
+        self.codes = codes
+        self.bounds = bounds
+
+    def mask(self, columns: dict, rows: slice) -> np.ndarray:
+        """
+        Args:
+            columns (dict): Column name → array (e.g. a column_store.ColumnStore).
+            rows (slice): Rows of the columns to test.
+
+        Returns:
+            np.ndarray: Boolean mask of the matching rows of the slice.
+        """
+        day = columns['day'][rows]
+        keep = np.ones(len(day), dtype=bool)
+        if self.day_range is not None:
+            keep &= (day >= self.day_range[0]) & (day <= self.day_range[1])
+        if self.years is not None:
+            keep &= np.isin(columns['year'][rows], self.years)
+        if self.codes is not None:
+            keep &= np.isin(columns['crime'][rows], self.codes)
+        if self.bounds is not None:
+            lat_min, lat_max, lon_min, lon_max = self.bounds
+            lat, lon = columns['latitude'][rows], columns['longitude'][rows]
+            keep &= (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+        return keep
+
+
+def preview_count(date_idx, store, filters: ExportFilters) -> dict:
+    """
+    Number of rows an export would contain, from the precomputed aggregates.
+
+    Args:
+        date_idx (date_index.DateRangeIndex): Prefix sums of the dataset.
+        store (column_store.ColumnStore): The dataset (its grid only).
+        filters (ExportFilters): Export filters.
+
+    Returns:
+        dict: {"rows": int, "exact": bool}. With bounds, the count is scaled by
+            the share of incidents of the grid cells inside the bounds.
+    """
+    start, end = (None, None)
+    if filters.day_range is not None:
+        start, end = (day - date_idx.first_day for day in filters.day_range)
+    codes = slice(None) if filters.codes is None else list(filters.codes)
+
+    if filters.years is None:
+        rows = int(date_idx.type_counts(start, end)[codes].sum())
+    else:
+        rows = 0
+        for year in filters.years:
+            year_start = date_idx.offset(f"{year}-01-01")
+            year_end = date_idx.offset(f"{year + 1}-01-01") - 1
+            if start is not None:
+                year_start, year_end = max(year_start, start), min(year_end, end)
+            if year_start <= year_end:
+                rows += int(date_idx.type_counts(year_start, year_end)[codes].sum())
+
+    if filters.bounds is None:
+        return {"rows": rows, "exact": True}
+    cells = date_idx.cell_counts(start, end)
+    bounds, size = store.grid
+    lat_min, lat_max, lon_min, lon_max = bounds
+    centers_lat = lat_min + (np.arange(size) + 0.5) * (lat_max - lat_min) / size
+    centers_lon = lon_min + (np.arange(size) + 0.5) * (lon_max - lon_min) / size
+    b_lat_min, b_lat_max, b_lon_min, b_lon_max = filters.bounds
+    inside = (((centers_lat >= b_lat_min) & (centers_lat <= b_lat_max))[:, None]
+              & ((centers_lon >= b_lon_min) & (centers_lon <= b_lon_max))[None, :]).ravel()
+    share = cells[inside].sum() / cells.sum() if cells.sum() else 0.0
+    return {"rows": int(round(rows * share)), "exact": False}
+
+
+class _Sink:
+    # Write-only file object whose content is drained by the generator after each batch
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def record_batches(store, filters: ExportFilters, batch_rows: int):
+    """
+    Matching rows as Arrow record batches of about batch_rows rows.
+
+    Args:
+        store (column_store.ColumnStore): The dataset.
+        filters (ExportFilters): Export filters.
+        batch_rows (int): Target number of rows per batch.
+
+    Yields:
+        pyarrow.RecordBatch: Columns of EXPORT_COLUMNS.
+    """
+    pending, pending_rows = [], 0
+    for begin in range(0, len(store), SCAN_ROWS):
+        rows = slice(begin, min(begin + SCAN_ROWS, len(store)))
+        index = np.flatnonzero(filters.mask(store, rows)) + begin
+        for part in range(0, len(index), batch_rows):
+            pending.append(index[part:part + batch_rows])
+            pending_rows += len(pending[-1])
+            if pending_rows >= batch_rows:
+                yield to_record_batch(store, np.concatenate(pending))
+                pending, pending_rows = [], 0
+    if pending_rows:
+        yield to_record_batch(store, np.concatenate(pending))
+
+
+def to_record_batch(store, index: np.ndarray):
+    """
+    Args:
+        store (column_store.ColumnStore): The dataset.
+        index (np.ndarray): Rows to export.
+
+    Returns:
+        pyarrow.RecordBatch: Columns of EXPORT_COLUMNS for those rows.
+    """
+    import pyarrow as pa
+
+    # Fancy indexing copies only the selected rows out of the mapped columns
+    arrays = {
+        'date': pa.array(store['date'][index], type=pa.timestamp('ns')),
+        'primary_type': pa.array(store.crime_types, type=pa.string()).take(pa.array(store['crime'][index])),
+    }
+    for name in EXPORT_COLUMNS[2:]:
+        arrays[name] = pa.array(store[name][index])
+    return pa.RecordBatch.from_arrays([arrays[name] for name in EXPORT_COLUMNS], names=EXPORT_COLUMNS)
+
+
+def stream(store, filters: ExportFilters, fmt: str = "csv"):
+    """
+    Encoded export, chunk by chunk. The writer is opened before the first
+    batch, so the header (CSV) or magic bytes (Parquet) leave immediately.
+
+    Args:
+        store (column_store.ColumnStore): The dataset.
+        filters (ExportFilters): Export filters.
+        fmt (str): One of FORMATS.
+
+    Yields:
+        bytes: Successive chunks of the CSV or Parquet file.
+    """
+    import pyarrow as pa
+
+    batch_rows = max(CHUNK_BYTES // ROW_BYTES[fmt], 1024)
+    sink = _Sink()
+    schema = to_record_batch(store, np.empty(0, dtype=np.int64)).schema
+    if fmt == "csv":
+        import pyarrow.csv as pa_csv
+        writer = pa_csv.CSVWriter(pa.PythonFile(sink, mode='w'), schema)
+    else:
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression='snappy')
+
+    try:
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+        for batch in record_batches(store, filters, batch_rows):
+            if fmt == "csv":
+                writer.write_batch(batch)
+            else:
+                # One row group per batch, written out as soon as it is complete
+                writer.write_table(pa.Table.from_batches([batch]))
+            yield sink.drain()
+    finally:
+        # Also runs when the client disconnects and the generator is closed
+        writer.close()
+    yield sink.drain()
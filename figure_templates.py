@@ -0,0 +1,479 @@
+"""
+figure_templates.py
+
+Cached layout and trace templates shared by the chart builders.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+import legend
+
+try:
+    from dash import Patch
+except ImportError:  # Dash < 2.9 has no partial updates
+    Patch = None
+
+
+
+def _values(values) -> list:
+    # Plain Python scalars serialize faster than numpy ones
+    return np.asarray(values).tolist()
+
+
+def _layout_json(**layout) -> dict:
+    # Cached layouts are shared by every request: copy them, never mutate in place.
+    # Going through go.Figure applies the default theme exactly as before.
+    # Plotly is imported here, on the first layout built, rather than at import time
+    import plotly.graph_objects as go
+
+    return go.Figure(layout=layout).to_dict()["layout"]
+
+
+# ===== Map =====
+
+@lru_cache(maxsize=None)
+def _map_layout(view: tuple) -> dict:
+    # view is (lat, lon, zoom), or None to let Plotly place the map
+    mapbox = dict(style="carto-positron")
+    if view is not None:
+        mapbox.update(center={"lat": view[0], "lon": view[1]}, zoom=view[2])
+    return _layout_json(
+        mapbox=mapbox,
+        height=900,
+        margin={"r": 0, "t": 0, "l": 0, "b": 0},
+        legend_title="Crime Types",
+        plot_bgcolor='#111111',
+        paper_bgcolor='#111111',
+        font=dict(color='white', family='Arial'),
+        # Keeps the user's pan and zoom while the data changes, until the view
+        # itself changes (another dataset)
+        uirevision=f"map-{view}"
+    )
+
+
+def map_figure(traces: list, title: str = None, view: dict = None, layers: list = None) -> dict:
+    """
+    Assemble a map figure from the cached layout.
+
+    Args:
+        traces (list of dict): Traces built with map_trace.
+        title (str): Figure title, or None for no title.
+        view (dict): Initial {"center": {"lat", "lon"}, "zoom"} of the dataset, or None.
+        layers (list of dict): Extra mapbox layers (e.g. density tiles).
+
+    Returns:
+        dict: Figure dict.
+    """
+    key = None if view is None else (view["center"]["lat"], view["center"]["lon"], view["zoom"])
+    base = _map_layout(key)
+    layout = dict(base, mapbox=dict(base["mapbox"], layers=layers or []))
+    if title is not None:
+        layout["title"] = map_title(title)
+    return {"data": traces, "layout": layout}
+
+
+def map_placeholder_trace() -> dict:
+    """
+    Empty trace keeping the mapbox subplot alive when the map only shows layers.
+
+    Returns:
+        dict: Trace dict.
+    """
+    return {"type": "scattermapbox", "lat": [], "lon": [], "showlegend": False, "hoverinfo": "skip"}
+
+
+def map_title(text: str) -> dict:
+    """
+    Args:
+        text (str): Title text.
+
+    Returns:
+        dict: Title settings of the map layout.
+    """
+    return {'text': text, 'x': 0.5, 'xanchor': 'center', 'font': {'size': 20}}
+
+
+def map_trace(name: str, color: str, lat, lon, size, text, visible=True) -> dict:
+    """
+    Scattermapbox trace of clustered crimes.
+
+    Args:
+        name (str): Crime type.
+        color (str): Marker color.
+        lat, lon (array-like): Cluster centers.
+        size (array-like): Marker areas.
+        text (array-like of str): Hover texts.
+        visible (bool or str): True or 'legendonly'.
+
+    Returns:
+        dict: Trace dict.
+    """
+    return {
+        "type": "scattermapbox",
+        "mode": "markers",
+        "name": name,
+        "lat": _values(lat),
+        "lon": _values(lon),
+        "text": _values(text),
+        "marker": {"size": _values(size), "sizemode": "area", "opacity": 0.7, "color": color},
+        "hovertemplate": "%{text}<extra></extra>",
+        "hoverlabel": legend.COMMON_HOVER_CONFIG['hoverlabel'],
+        "visible": visible
+    }
+
+
+def choropleth_trace(geojson, locations, z, text, color: str, name: str) -> dict:
+    """
+    Choroplethmapbox trace shading areas from transparent to a crime color.
+
+    Args:
+        geojson (str or dict): Boundaries, or the URL serving them (fetched once by the browser).
+        locations (list of str): Feature ids.
+        z (array-like): Count of each area.
+        text (array-like of str): Hover texts.
+        color (str): Color of the densest areas.
+        name (str): Layer name.
+
+    Returns:
+        dict: Trace dict.
+    """
+    return {
+        "type": "choroplethmapbox",
+        "name": name,
+        "geojson": geojson,
+        "featureidkey": "id",
+        "locations": _values(locations),
+        "z": _values(z),
+        "text": _values(text),
+        "colorscale": [[0.0, "rgba(255,255,255,0.05)"], [1.0, color]],
+        "marker": {"opacity": 0.75, "line": {"width": 0.5, "color": "#444444"}},
+        "colorbar": {"title": {"text": "Crimes"}, "tickformat": "~s"},
+        "hovertemplate": "%{text}<extra></extra>",
+        "hoverlabel": legend.COMMON_HOVER_CONFIG['hoverlabel']
+    }
+
+
+def map_patch(fig: dict):
+    """
+    Turn a full map figure into a partial update of its traces, layers, title
+    and view; the view only moves when it differs from the previous one.
+
+    Falls back to the full figure when Dash does not support Patch.
+
+    Args:
+        fig (dict): Figure built with map_figure.
+
+    Returns:
+        dash.Patch or dict: Update to send to the browser.
+    """
+    if Patch is None:
+        return fig
+    patch = Patch()
+    patch["data"] = fig["data"]
+    patch["layout"]["title"] = fig["layout"].get("title", {"text": ""})
+    patch["layout"]["mapbox"]["layers"] = fig["layout"]["mapbox"].get("layers", [])
+    if "center" in fig["layout"]["mapbox"]:
+        patch["layout"]["mapbox"]["center"] = fig["layout"]["mapbox"]["center"]
+        patch["layout"]["mapbox"]["zoom"] = fig["layout"]["mapbox"]["zoom"]
+    patch["layout"]["uirevision"] = fig["layout"]["uirevision"]
+    return patch
+
+
+# ===== Line chart =====
+
+LINE_HOVER = {
+    'hour': "<b>Hour: %{x}:00</b><br>Crime Type: %{fullData.name}<br>Average Count: %{y:.0f}<extra></extra>",
+    'month': "<b>Month: %{x}</b><br>Crime Type: %{fullData.name}<br>Average Count: %{y:.0f}<extra></extra>",
+    'year': "<b>Year: %{x}</b><br>Crime Type: %{fullData.name}<br>Total Count: %{y:.0f}<extra></extra>",
+}
+
+
+@lru_cache(maxsize=None)
+def _line_layout(time_unit: str) -> dict:
+    xaxis = dict(tickmode='linear', title=time_unit.capitalize())
+    if time_unit == 'hour':
+        xaxis.update(tickmode='array', tickvals=list(range(1, 24)), title='Hour')
+    elif time_unit == 'month':
+        xaxis.update(
+            tickmode='array',
+            tickvals=list(range(1, 13)),
+            ticktext=["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                      "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+            title='Month'
+        )
+    elif time_unit == 'year':
+        xaxis.update(tickmode='linear', title='Year')
+
+    yaxis = dict(title='Number of Crimes')
+    if time_unit in ['month', 'year']:
+        yaxis.update(tickmode='array')
+
+    return _layout_json(
+        xaxis=xaxis,
+        yaxis=yaxis,
+        template='plotly_dark',
+        height=600,
+        font=dict(family='Arial'),
+        legend=dict(title=dict(text='Crime Type'), tracegroupgap=0),
+        margin=dict(t=60),
+        title={
+            'text': f"Crime Distribution by {time_unit.capitalize()}",
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 20},
+        },
+    )
+
+
+def line_figure(traces: list, time_unit: str, x_min: float, y_min: float) -> dict:
+    """
+    Assemble a stacked area chart from the cached layout of a time unit.
+
+    Args:
+        traces (list of dict): Traces built with line_trace.
+        time_unit (str): One of ["hour", "month", "year"].
+        x_min (float): Smallest x value, used to pad the axis start.
+        y_min (float): Smallest y value, used to pad the axis start.
+
+    Returns:
+        dict: Figure dict.
+    """
+    base = _line_layout(time_unit)
+    # Only the axes are modified; the rest of the cached layout is shared
+    layout = dict(base, xaxis=dict(base['xaxis']), yaxis=dict(base['yaxis']))
+    if time_unit == 'hour':
+        layout['xaxis']['range'] = [0.1, None]
+    elif time_unit == 'month':
+        layout['xaxis']['range'] = [x_min - 0.2, None]
+        layout['yaxis']['range'] = [y_min - 0.2, None]
+    elif time_unit == 'year':
+        layout['xaxis']['range'] = [x_min - 0.1, None]
+        layout['yaxis']['range'] = [y_min - 0.2, None]
+    return {"data": traces, "layout": layout}
+
+
+def line_trace(name: str, color: str, x, y, time_unit: str) -> dict:
+    """
+    Stacked area trace of one crime type.
+
+    Args:
+        name (str): Crime type.
+        color (str): Line color.
+        x, y (array-like): Time values and counts.
+        time_unit (str): One of ["hour", "month", "year"].
+
+    Returns:
+        dict: Trace dict.
+    """
+    return {
+        "type": "scatter",
+        "mode": "lines",
+        "stackgroup": "1",
+        "name": name,
+        "legendgroup": name,
+        "showlegend": True,
+        "x": _values(x),
+        "y": _values(y),
+        "line": {"color": color},
+        "hovertemplate": LINE_HOVER[time_unit],
+        "hoverlabel": legend.COMMON_HOVER_CONFIG['hoverlabel']
+    }
+
+
+# ===== Bar chart =====
+
+@lru_cache(maxsize=None)
+def _bar_layout() -> dict:
+    return _layout_json(
+        barmode='stack',
+        title={
+            'text': "Crime Distribution: Weekday vs Weekend",
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 20}
+        },
+        plot_bgcolor='#111111',
+        paper_bgcolor='#111111',
+        font=dict(color='white'),
+        xaxis=dict(title='Period'),
+        yaxis=dict(
+            title='Number of Crimes',
+            tickformat='~s'
+        ),
+        legend=dict(title=dict(text='Crime Type'), tracegroupgap=0),
+        height=600,
+    )
+
+
+def bar_figure(traces: list) -> dict:
+    """
+    Args:
+        traces (list of dict): Traces built with bar_trace.
+
+    Returns:
+        dict: Stacked bar figure dict.
+    """
+    return {"data": traces, "layout": dict(_bar_layout())}
+
+
+def bar_trace(name: str, color: str, x, y, customdata) -> dict:
+    """
+    Stacked bar trace of one crime type.
+
+    Args:
+        name (str): Crime type.
+        color (str): Bar color.
+        x (array-like): Periods.
+        y (array-like): Counts.
+        customdata (array-like of str): Formatted counts shown on hover.
+
+    Returns:
+        dict: Trace dict.
+    """
+    return {
+        "type": "bar",
+        "name": name,
+        "legendgroup": name,
+        "x": _values(x),
+        "y": _values(y),
+        "customdata": _values(customdata),
+        "marker": {"color": color},
+        "hovertemplate": (
+            '<b>%{x}</b><br>'
+            f'Crime Type: {name}<br>'
+            'Count: %{customdata}<extra></extra>'
+        ),
+        "hoverlabel": legend.COMMON_HOVER_CONFIG['hoverlabel']
+    }
+
+
+# ===== Heatmap =====
+
+@lru_cache(maxsize=None)
+def _heatmap_layout() -> dict:
+    return _layout_json(
+        plot_bgcolor='#111111',
+        paper_bgcolor='#111111',
+        font=dict(color='white', family='Arial'),
+        xaxis=dict(title='Hour', tickmode='linear', dtick=1, ticksuffix='h'),
+        # First day (or month) on top
+        yaxis=dict(autorange='reversed'),
+        height=500,
+        margin=dict(t=60),
+    )
+
+
+def heatmap_figure(trace: dict, title: str) -> dict:
+    """
+    Args:
+        trace (dict): Trace built with heatmap_trace.
+        title (str): Figure title.
+
+    Returns:
+        dict: Heatmap figure dict.
+    """
+    layout = dict(_heatmap_layout(), title={'text': title, 'x': 0.5, 'xanchor': 'center', 'font': {'size': 20}})
+    return {"data": [trace], "layout": layout}
+
+
+def heatmap_trace(x, y, z) -> dict:
+    """
+    Heatmap trace of crime counts.
+
+    Args:
+        x (array-like): Hours.
+        y (list of str): Row labels (days or months).
+        z (array-like): (len(y), len(x)) counts.
+
+    Returns:
+        dict: Trace dict.
+    """
+    return {
+        "type": "heatmap",
+        "x": _values(x),
+        "y": list(y),
+        "z": _values(z),
+        "colorscale": "YlOrRd",
+        "colorbar": {"title": {"text": "Crimes"}, "tickformat": "~s"},
+        "xgap": 1,
+        "ygap": 1,
+        "hovertemplate": "<b>%{y}, %{x}:00</b><br>Crimes: %{z:,}<extra></extra>",
+        "hoverlabel": legend.COMMON_HOVER_CONFIG['hoverlabel']
+    }
+
+
+# ===== Arrest-rate trend =====
+
+@lru_cache(maxsize=None)
+def _rate_layout() -> dict:
+    return _layout_json(
+        template='plotly_dark',
+        plot_bgcolor='#111111',
+        paper_bgcolor='#111111',
+        font=dict(color='white', family='Arial'),
+        yaxis=dict(title='Arrest Rate', tickformat='.0%', rangemode='tozero'),
+        legend=dict(title=dict(text='Crime Type'), tracegroupgap=0),
+        height=600,
+        margin=dict(t=60),
+    )
+
+
+def rate_figure(traces: list, title: str, x_title: str) -> dict:
+    """
+    Args:
+        traces (list of dict): Traces built with rate_trace.
+        title (str): Figure title.
+        x_title (str): Title of the x axis.
+
+    Returns:
+        dict: Arrest-rate trend figure dict.
+    """
+    base = _rate_layout()
+    layout = dict(
+        base,
+        xaxis=dict(base.get('xaxis', {}), title={'text': x_title}, type='category'),
+        title={'text': title, 'x': 0.5, 'xanchor': 'center', 'font': {'size': 20}},
+    )
+    return {"data": traces, "layout": layout}
+
+
+def rate_trace(name: str, color: str, x, rate, low, high, totals) -> dict:
+    """
+    Arrest rate of one crime type, with its confidence interval as error bars.
+
+    Args:
+        name (str): Crime type.
+        color (str): Line color.
+        x (array-like): Years or months.
+        rate, low, high (array-like): Arrest rate and interval bounds.
+        totals (array-like): Number of incidents behind each rate.
+
+    Returns:
+        dict: Trace dict.
+    """
+    rate, low, high = (np.asarray(v, dtype=float) for v in (rate, low, high))
+    return {
+        "type": "scatter",
+        "mode": "lines+markers",
+        "name": name,
+        "legendgroup": name,
+        "x": _values(x),
+        "y": _values(rate),
+        "error_y": {"type": "data", "array": _values(high - rate), "arrayminus": _values(rate - low),
+                    "thickness": 1, "width": 3, "color": color},
+        "customdata": _values(np.column_stack([low, high, totals])),
+        "line": {"color": color},
+        "hovertemplate": (
+            f"<b>{name}</b><br>"
+            "%{x}: %{y:.1%}<br>"
+            "95% CI: %{customdata[0]:.1%} – %{customdata[1]:.1%}<br>"
+            "Incidents: %{customdata[2]:,}<extra></extra>"
+        ),
+        "hoverlabel": legend.COMMON_HOVER_CONFIG['hoverlabel']
+    }
@@ -0,0 +1,114 @@
+"""
+heatmap.py
+
+Day-of-week × hour and month × hour heatmaps of crime counts.
+A single int32 tensor indexed by (calendar month, crime type, weekday, hour) is
+built once, with one np.bincount over combined indices of the encoded date
+parts of the column store. Both views are sums of its slices: selecting years,
+a date range (resolved to whole months) or crime types never scans incidents.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+
+import figure_templates
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+# Row labels of each view
+ROWS = {"weekday": WEEKDAYS, "month": MONTHS}
+
+
+def month_hour_counts(columns, n_crimes: int) -> np.ndarray:
+    """
+    Args:
+        columns (dict): 'year', 'month', 'crime', 'weekday' and 'hour' arrays.
+        n_crimes (int): Number of crime-type codes.
+
+    Returns:
+        np.ndarray: int32 counts of shape (months, crime types, 7, 24), starting
+            at the month of the earliest incident.
+    """
+    month = ((np.asarray(columns['year'], dtype=np.int64) - 1970) * 12
+             + np.asarray(columns['month'], dtype=np.int64) - 1)
+    first_month = int(month.min()) if len(month) else 0
+    n_months = int(month.max()) - first_month + 1 if len(month) else 1
+    flat = (month - first_month) * n_crimes + np.asarray(columns['crime'], dtype=np.int64)
+    flat = (flat * 7 + np.asarray(columns['weekday'], dtype=np.int64)) * 24 + np.asarray(columns['hour'], dtype=np.int64)
+    counts = np.bincount(flat, minlength=n_months * n_crimes * 7 * 24)
+    return counts.reshape(n_months, n_crimes, 7, 24).astype(np.int32)
+
+
+class HourHistogram:
+    """
+    (calendar month, crime type, weekday, hour) counts of a column_store.ColumnStore.
+    """
+
+    def __init__(self, store):
+        """
+        Args:
+            store (column_store.ColumnStore): Store with the 'hour_counts' aggregate.
+        """
+        first_day = np.datetime64(store.first_day, 'D')
+        self.first_month = int(first_day.astype('datetime64[M]').astype(np.int64))
+        self._counts = store.aggregates['hour_counts']
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Private memory of the tensor; 0 when memory-mapped.
+        """
+        return 0 if isinstance(self._counts, np.memmap) else self._counts.nbytes
+
+    def counts(self, view: str, years=None, codes=None, month_range: tuple = None) -> np.ndarray:
+        """
+        Args:
+            view (str): "weekday" or "month".
+            years (list of int): Years to add up, all when None.
+            codes (list of int): Crime-type codes to add up, all when None.
+            month_range (tuple): Inclusive (first, last) calendar months, as months
+                since 1970-01 (see arrest_rates.month_index), or None.
+
+        Returns:
+            np.ndarray: (day or month, hour) counts.
+        """
+        months = self.first_month + np.arange(len(self._counts))
+        keep = np.ones(len(months), dtype=bool)
+        if years is not None:
+            keep &= np.isin(months // 12 + 1970, list(years))
+        if month_range is not None:
+            keep &= (months >= month_range[0]) & (months <= month_range[1])
+        counts = self._counts[keep]
+        if codes is not None:
+            counts = counts[:, list(codes)]
+        if view == "weekday":
+            return counts.sum(axis=(0, 1), dtype=np.int64)
+        per_month = counts.sum(axis=(1, 2), dtype=np.int64)
+        result = np.zeros((12, 24), dtype=np.int64)
+        np.add.at(result, months[keep] % 12, per_month)
+        return result
+
+
+def create_heatmap(counts: np.ndarray, view: str = "weekday", title: str = None) -> dict:
+    """
+    Build the heatmap figure of a (day or month, hour) count matrix.
+
+    Args:
+        counts (np.ndarray): Output of HourHistogram.counts.
+        view (str): "weekday" or "month".
+        title (str): Figure title, defaults to one describing the view.
+
+    Returns:
+        dict: Heatmap figure.
+    """
+    if title is None:
+        title = f"Crimes by {'Day of Week' if view == 'weekday' else 'Month'} and Hour"
+    return figure_templates.heatmap_figure(
+        figure_templates.heatmap_trace(np.arange(24), ROWS[view], counts), title
+    )
@@ -4,14 +4,20 @@ utils.py
 Helper constants and functions used across multiple charts and visualizations.
 Includes:
 - Common hover configuration for consistent styling
-- Custom color mapping for crime types
+- Custom color mapping for crime types, with deterministic colors for the others
 - Label formatting utilities
-- Number formatting with rounding
+- Number formatting with rounding, including vectorized k/M formatting
+- Splitting a DataFrame into per-trace arrays with a single groupby
 
 Author: [Your Name]
 Date: June 2025
 """
 
+import colorsys
+import hashlib
+
+import numpy as np
+
 # ===== Constants =====
 
 # Common hover config used across Plotly figures
@@ -55,6 +61,28 @@ def format_proper_name(name: str) -> str:
     return name.lower().capitalize()
 
 
+def crime_color(name: str) -> str:
+    """
+    Color of a crime type: the CUSTOM_COLORS entry when there is one, otherwise
+    a color derived from a hash of the name, identical across charts and processes.
+
+    Args:
+        name (str): Crime type, in any letter case.
+
+    Returns:
+        str: Hex color string.
+    """
+    name = format_proper_name(name)
+    if name in CUSTOM_COLORS:
+        return CUSTOM_COLORS[name]
+    digest = hashlib.md5(name.encode("utf-8")).digest()
+    hue = int.from_bytes(digest[:2], "big") / 65535
+    lightness = 0.40 + digest[2] / 255 * 0.20
+    saturation = 0.55 + digest[3] / 255 * 0.35
+    red, green, blue = colorsys.hls_to_rgb(hue, lightness, saturation)
+    return "#{:02X}{:02X}{:02X}".format(round(red * 255), round(green * 255), round(blue * 255))
+
+
 def preprocess_labels(df, columns):
     """
     Apply proper name formatting to specific columns in a DataFrame.
@@ -86,3 +114,47 @@ def format_number(num: float) -> float:
     if num >= 1000:
         return float(f"{num / 1000:.1f}")
     return num
+
+
+def format_counts(values, decimals: int = 1):
+    """
+    Format a whole array of counts with k/M suffixes (e.g. 1400 → "1.4k",
+    2500000 → "2.5M", 532 → "532") without a Python-level loop per value.
+
+    Args:
+        values (array-like of float): Counts to format.
+        decimals (int): Decimals kept for suffixed values.
+
+    Returns:
+        np.ndarray: Array of formatted strings.
+    """
+    values = np.asarray(values, dtype=float)
+    magnitude = np.abs(values)
+    millions = magnitude >= 1_000_000
+    thousands = ~millions & (magnitude >= 1_000)
+
+    scaled = np.where(millions, values / 1_000_000, values / 1_000)
+    suffixed = np.char.add(np.char.mod(f"%.{decimals}f", scaled), np.where(millions, "M", "k"))
+    plain = np.char.mod("%d", np.rint(values).astype(np.int64))
+    return np.where(millions | thousands, suffixed, plain)
+
+
+def group_to_traces(df, key, columns):
+    """
+    Split a DataFrame into one set of column arrays per category, using a
+    single groupby instead of one boolean filter per trace.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        key (str): Column holding the trace names (e.g. crime type).
+        columns (list of str): Columns to extract for each trace.
+
+    Returns:
+        dict: {trace name: {column: np.ndarray}}, ordered by trace name.
+    """
+    values = {col: df[col].to_numpy() for col in columns}
+    groups = df.groupby(key, sort=True, observed=True).indices
+    return {
+        name: {col: arr[groups[name]] for col, arr in values.items()}
+        for name in sorted(groups)
+    }
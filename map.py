@@ -1,59 +1,43 @@
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from sklearn.cluster import DBSCAN
 import numpy as np
 
+import arrest_rates
+import density
+import figure_templates
 import legend
 
 
-def create_map(df: pd.DataFrame, selected_year: int = None, selected_crimes: list = None):
-    df['primary_type'] = df['primary_type'].astype(str).apply(legend.format_proper_name)
+def create_map(df: pd.DataFrame, selected_year: int = None, selected_crimes: list = None, day_range: tuple = None,
+               rates=None, view: dict = None):
     if selected_year is None:
         selected_year = df['year'].max()
-    year_df = df[df['year'] == selected_year].copy()
+    # Work on a copy: the shared frame is read by concurrent callbacks
+    mask = df['year'] == selected_year
+    if day_range is not None and 'day' in df.columns:
+        mask &= df['day'].between(*day_range)
+    year_df = df[mask].copy()
+    year_df['primary_type'] = year_df['primary_type'].astype(str).apply(legend.format_proper_name)
 
     if not selected_crimes:
-        return px.scatter_mapbox(
-            pd.DataFrame(columns=["latitude", "longitude", "primary_type"]),
-            lat="latitude",
-            lon="longitude",
-            mapbox_style="carto-positron",
-            zoom=9,
-            center={"lat": 41.8781, "lon": -87.6298}
-        ).update_layout(
-            margin={"r": 0, "t": 0, "l": 0, "b": 0},
-            height=900,
-            legend_title="Crime Types",
-            plot_bgcolor='#111111',
-            paper_bgcolor='#111111',
-            font=dict(color='white', family='Arial')
-        )
+        return figure_templates.map_figure([], view=view)
 
     selected_crimes = [legend.format_proper_name(crime) for crime in selected_crimes]
     filtered = year_df[year_df['primary_type'].isin(selected_crimes)].copy()
     
     if filtered.empty:
-        return px.scatter_mapbox(
-            pd.DataFrame(columns=["latitude", "longitude", "primary_type"]),
-            lat="latitude",
-            lon="longitude",
-            mapbox_style="carto-positron",
-            zoom=9,
-            center={"lat": 41.8781, "lon": -87.6298}
-        ).update_layout(
-            margin={"r": 0, "t": 0, "l": 0, "b": 0},
-            height=900,
-            legend_title="Crime Types",
-            plot_bgcolor='#111111',
-            paper_bgcolor='#111111',
-            font=dict(color='white', family='Arial')
-        )
+        return figure_templates.map_figure([], view=view)
 
-    crime_counts = filtered['primary_type'].value_counts().reset_index()
+    if 'weight' not in filtered.columns:
+        filtered['weight'] = 1.0
+
+    # Sampled rows are weighted, so counts are estimates of the true totals
+    crime_counts = filtered.groupby('primary_type')['weight'].sum().reset_index()
     crime_counts.columns = ['crime_type', 'count']
     top_5_crimes = crime_counts.nlargest(5, 'count')['crime_type'].tolist()
 
+    # scikit-learn is slow to import and only needed by the cluster view
+    from sklearn.cluster import DBSCAN
+
     traces = []
     for crime in selected_crimes:
         crime_df = filtered[filtered['primary_type'] == crime].copy()
@@ -72,58 +56,100 @@ def create_map(df: pd.DataFrame, selected_year: int = None, selected_crimes: lis
         grouped = crime_df.groupby('cluster').agg({
             'latitude': 'mean',
             'longitude': 'mean',
-            'primary_type': 'count'
-        }).rename(columns={'primary_type': 'count'}).reset_index()
+            'weight': 'sum'
+        }).rename(columns={'weight': 'count'}).reset_index()
+        grouped['count'] = grouped['count'].round().astype(int)
 
         total = grouped['count'].sum()
         grouped['percentage'] = grouped['count'] / total * 100
-        grouped['label'] = crime
         grouped['latitude'] += np.random.uniform(-0.0005, 0.0005, size=len(grouped))
         grouped['longitude'] += np.random.uniform(-0.0005, 0.0005, size=len(grouped))
 
-        marker_color = legend.CUSTOM_COLORS.get(crime, px.colors.qualitative.Bold[len(traces) % len(px.colors.qualitative.Bold)])
+        marker_color = legend.crime_color(crime)
         
         visible = True if crime in top_5_crimes else 'legendonly'
+
+        text = (
+            f"<b>{crime}</b><br>Count: " + grouped['count'].map('{:,}'.format)
+            + "<br>Percentage: " + grouped['percentage'].map('{:.1f}'.format) + "%"
+        )
+        code = rates.crime_code(crime) if rates is not None else -1
+        if code >= 0:
+            # Arrest rate of the grid cell under each cluster, for the whole year
+            cells = rates.cells(grouped['latitude'], grouped['longitude'])
+            cell_rates = rates.rates(("cell",), codes=[code], years=[selected_year], cells=cells)
+            text = text + f"<br>Arrest rate ({selected_year}, this area): " + arrest_rates.format_rates(
+                cell_rates["rate"], cell_rates["low"], cell_rates["high"]
+            )
         
-        traces.append(go.Scattermapbox(
-            lat=grouped['latitude'],
-            lon=grouped['longitude'],
-            mode='markers',
-            marker=go.scattermapbox.Marker(
-                size = np.sqrt(grouped['count']) * 120,
-                sizemode='area',
-                opacity=0.7,
-                color=marker_color
-            ),
-            text=grouped.apply(
-                lambda row: f"<b>{row['label']}</b><br>Count: {row['count']:,}<br>Percentage: {row['percentage']:.1f}%", 
-                axis=1
-            ),
-            name=crime,
-            hovertemplate="%{text}<extra></extra>",
-            hoverlabel=legend.COMMON_HOVER_CONFIG['hoverlabel'],
-            visible=visible
+        traces.append(figure_templates.map_trace(
+            crime,
+            marker_color,
+            grouped['latitude'],
+            grouped['longitude'],
+            np.sqrt(grouped['count']) * 120,
+            text,
+            visible
         ))
 
-    fig = go.Figure(data=traces)
-    fig.update_layout(
-        mapbox=dict(
-            style="carto-positron",
-            center={"lat": 41.8781, "lon": -87.6298},
-            zoom=10
-        ),
-        height= 900,
-        margin={"r": 0, "t": 0, "l": 0, "b": 0},
-        legend_title="Crime Types",
-        plot_bgcolor='#111111',
-        paper_bgcolor='#111111',
-        font=dict(color='white', family='Arial'),
-        title={
-            'text': f"Crime Distribution - {selected_year}",
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 20}
-        }
+    return figure_templates.map_figure(traces, title=f"Crime Distribution - {selected_year}", view=view)
+
+
+def create_density_map(selected_year: int, tile_url: str, view: dict = None):
+    """
+    Map showing every incident as server-rendered density tiles.
+
+    Args:
+        selected_year (int): Year shown in the title.
+        tile_url (str): XYZ tile URL template of the selected year, date range and
+            crimes (see the /tiles/density route in app.py), or None for an empty map.
+        view (dict): Initial center and zoom of the dataset (see figure_templates.map_figure).
+
+    Returns:
+        dict: Map figure.
+    """
+    return figure_templates.map_figure(
+        [figure_templates.map_placeholder_trace()],
+        title=f"Crime Density - {selected_year}",
+        view=view,
+        layers=[density.tile_layer(tile_url)] if tile_url else []
     )
 
-    return fig
+
+def create_choropleth_map(layer, geojson_url: str, selected_year: int, crime_codes: list, crime_names: list,
+                          day_range: tuple = None, view: dict = None):
+    """
+    Map shading each police beat or community area by its number of crimes,
+    counted from the layer's sorted (crime type, area, day) keys.
+
+    Args:
+        layer (choropleth.ChoroplethLayer): Boundaries and keys.
+        geojson_url (str): URL serving the layer's boundaries.
+        selected_year (int): Selected year.
+        crime_codes (list of int): Store codes of the selected crime types.
+        crime_names (list of str): Names of the same crime types.
+        day_range (tuple): Inclusive (start, end) in days since 1970-01-01, or None.
+        view (dict): Initial center and zoom of the dataset (see figure_templates.map_figure).
+
+    Returns:
+        dict: Map figure.
+    """
+    if not len(crime_codes):
+        return figure_templates.map_figure([], view=view)
+    per_crime = layer.area_counts(selected_year, crime_codes, day_range)
+    totals = per_crime.sum(axis=0)
+
+    names = [legend.format_proper_name(name) for name in crime_names]
+    # Areas without incidents have no most frequent crime
+    top_crime = np.where(totals > 0, np.asarray(names)[per_crime.argmax(axis=0)], "n/a")
+    text = (
+        "<b>" + pd.Series(layer.names) + "</b><br>Count: " + pd.Series(totals).map('{:,}'.format)
+        + "<br>Most frequent: " + pd.Series(top_crime)
+    )
+    # Shade with the color of the crime type dominating the selection
+    dominant = names[int(per_crime.sum(axis=1).argmax())]
+    trace = figure_templates.choropleth_trace(
+        geojson_url, layer.ids, totals, text,
+        legend.crime_color(dominant), layer.label
+    )
+    return figure_templates.map_figure([trace], title=f"{layer.label} - {selected_year}", view=view)
@@ -12,32 +12,90 @@ Date : 2025-06-22
 
 import os
 import pandas as pd
-import requests
-from io import BytesIO
 import numpy as np
 
+import column_store
+import date_index
+import sampling
+import synthetic
+
 DROPBOX_URL = "https://www.dropbox.com/scl/fi/j9fwky905by6i5qb5mi2w/chicago_crimes_2018_2024.parquet?rlkey=0c06zaptg1e6w7p62nthb0eq8&st=py05o5tx&dl=1"
 LOCAL_FILE = "chicago.parquet"
+STORE_DIR = "chicago_store"
+
+# Nombre d'incidents synthétiques à générer à la place de chicago.parquet (0 : données réelles)
+SYNTHETIC_ENV = "CHICAGO_SYNTHETIC"
+
 
-def load_main_dataset() -> pd.DataFrame:
+def synthetic_rows() -> int:
+    """
+    Returns:
+        int: Nombre d'incidents synthétiques demandés via CHICAGO_SYNTHETIC, 0 sinon.
+    """
+    return int(os.environ.get(SYNTHETIC_ENV, "0") or 0)
+
+
+def store_directory(source: str = LOCAL_FILE, years: tuple = None) -> str:
+    """
+    Chaque jeu de données (fichier source et plage d'années) a son propre stockage.
+    Les données synthétiques ont aussi leur propre répertoire, pour ne jamais être
+    confondues avec le stockage construit à partir des vraies données.
+
+    Args:
+        source (str): Fichier parquet du jeu de données.
+        years (tuple): (première, dernière) année conservée, ou None pour toutes.
+
+    Returns:
+        str: Répertoire du stockage colonnaire à utiliser.
+    """
+    directory = STORE_DIR if source == LOCAL_FILE else f"{os.path.splitext(source)[0]}_store"
+    if years:
+        directory += f"_{years[0]}_{years[1]}"
+    rows = synthetic_rows()
+    return f"{directory}_synthetic_{rows}" if rows else directory
+
+
+def load_main_dataset(source: str = LOCAL_FILE, url: str = DROPBOX_URL, years: tuple = None) -> pd.DataFrame:
     """
     Télécharge ou charge localement le jeu de données sur les crimes à Chicago.
-    Effectue un nettoyage, des conversions de types et filtre les 10 crimes les plus fréquents.
+    Effectue un nettoyage et des conversions de types. Tous les types de crime sont conservés ;
+    la sélection (top N ou liste explicite) se fait à la demande, voir select_crime_types.
+    Si CHICAGO_SYNTHETIC est défini, des incidents synthétiques sont générés à la place,
+    sans accès au réseau.
+
+    Args:
+        source (str): Fichier parquet local.
+        url (str): Adresse de téléchargement si le fichier est absent, ou None.
+        years (tuple): (première, dernière) année conservée, ou None pour toutes.
 
     Returns:
         pd.DataFrame: Le DataFrame nettoyé et préparé.
+
+    Raises:
+        FileNotFoundError: Si le fichier est absent et qu'aucune adresse n'est fournie.
+        RuntimeError: Si le téléchargement échoue. Le chargement se fait à la demande,
+            dans les requêtes et les workers : l'erreur est rapportée par la route ou
+            le callback au lieu d'arrêter le processus.
     """
-    if os.path.exists(LOCAL_FILE):
-        buffer = LOCAL_FILE
+    if synthetic_rows():
+        df = synthetic.synthetic_dataset(synthetic_rows())
+        return df[df['year'].between(*years)] if years else df
+    if os.path.exists(source):
+        buffer = source
+    elif url is None:
+        raise FileNotFoundError(source)
     else:
+        # Importé seulement si le fichier doit être téléchargé
+        import requests
+
         try:
-            response = requests.get(DROPBOX_URL, timeout=15)
+            response = requests.get(url, timeout=15)
             response.raise_for_status()
-            with open(LOCAL_FILE, "wb") as f:
+            with open(source, "wb") as f:
                 f.write(response.content)
-            buffer = LOCAL_FILE
+            buffer = source
         except requests.exceptions.RequestException as e:
-            exit(1)
+            raise RuntimeError(f"Téléchargement de {source} impossible depuis {url} : {e}") from e
 
     columns_needed = ['date', 'primary_type', 'arrest', 'latitude', 'longitude', 'year']
     dtype_mapping = {
@@ -53,95 +111,101 @@ def load_main_dataset() -> pd.DataFrame:
         if col in df.columns:
             df[col] = df[col].astype(dtype)
     df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    df = df.dropna(subset=['date', 'latitude', 'longitude'])
-    top_crimes = df['primary_type'].value_counts().head(10).index
-    df = df[df['primary_type'].isin(top_crimes)]
+    df = df.dropna(subset=['date', 'primary_type', 'latitude', 'longitude'])
+    if years:
+        df = df[df['year'].between(*years)]
     df['Crime_Type'] = df['primary_type'].str.title().astype('category')
     return df
 
 
-def prepare_bar_chart_data(df: pd.DataFrame) -> pd.DataFrame:
+def load_column_store(source: str = LOCAL_FILE, url: str = DROPBOX_URL, years: tuple = None) -> column_store.ColumnStore:
     """
-    Prépare les données pour un graphique en barres comparant les crimes en semaine vs fin de semaine.
+    Ouvre le stockage colonnaire partagé (fichiers .npy mappés en mémoire, en lecture seule).
+    Le stockage est construit une seule fois à partir de load_main_dataset ; les processus
+    suivants se contentent de mapper les fichiers, sans relire le parquet. Il est reconstruit
+    si le fichier source a changé (chemin, date de modification ou taille).
 
     Args:
-        df (pd.DataFrame): Le DataFrame de base.
+        source, url, years: Voir load_main_dataset.
 
     Returns:
-        pd.DataFrame: Données groupées par période (Weekday/Weekend) et type de crime.
+        column_store.ColumnStore: Colonnes nettoyées du jeu de données.
     """
-    df = df.copy()
-    df['day_of_week'] = df['date'].dt.dayofweek.astype('int8')
-    df['Period'] = (df['day_of_week'] >= 5).map({True: 'Weekend', False: 'Weekday'}).astype('category')
-    result = df.groupby(['Period', 'Crime_Type']).size().reset_index(name='Count')
-    return result
-
-
-def prepare_map_data(df: pd.DataFrame) -> pd.DataFrame:
+    directory = store_directory(source, years)
+    # Les données synthétiques ne dépendent d'aucun fichier
+    source_file = None if synthetic_rows() else source
+    if not column_store.is_valid(directory, source_file):
+        # Un seul processus construit le stockage ; les autres attendent puis le mappent
+        with column_store.build_lock(directory):
+            if not column_store.is_valid(directory, source_file):
+                column_store.write_store(load_main_dataset(source, url, years), directory, source_file)
+    return column_store.ColumnStore(directory)
+
+
+def select_crime_types(store: column_store.ColumnStore, top_n: int = None, crimes: list = None) -> list:
     """
-    Prépare un sous-échantillon des données géographiques pour une carte.
+    Sélectionne des types de crime à partir des effectifs précalculés du stockage,
+    sans parcourir les lignes.
 
     Args:
-        df (pd.DataFrame): Le DataFrame de base.
+        store (column_store.ColumnStore): Le stockage colonnaire.
+        top_n (int): Nombre de types les plus fréquents à garder (ignoré si crimes est fourni).
+        crimes (list of str): Liste explicite de types (toute casse).
 
     Returns:
-        pd.DataFrame: Échantillon aléatoire de coordonnées avec type de crime et année.
+        list of int: Codes des types sélectionnés, du plus au moins fréquent.
     """
-    df = df[["latitude", "longitude", "primary_type", "year"]].copy()
-    df = df.dropna()
-    return df.sample(n=min(len(df), 30000), random_state=42)
+    counts = np.asarray(store.crime_counts)
+    ranked = np.argsort(-counts, kind="stable")
+    if crimes is not None:
+        wanted = {str(c).upper() for c in crimes}
+        return [int(code) for code in ranked if store.crime_types[code].upper() in wanted]
+    if top_n is None:
+        return [int(code) for code in ranked]
+    return [int(code) for code in ranked[:max(int(top_n), 0)]]
 
 
-def prepare_sankey_data(df: pd.DataFrame) -> pd.DataFrame:
+def sample_map_store(store: column_store.ColumnStore) -> pd.DataFrame:
     """
-    Prépare les données pour un diagramme de Sankey entre types de crime et résolution (arrestation ou non).
+    Échantillon de la carte, tiré à l'écriture du stockage (column_store.map_sample).
+    Il est stratifié par (année, type de crime) : chaque strate garde une part de
+    ses lignes bornée par min/max, et la colonne 'weight' permet d'estimer sans
+    biais les effectifs réels. Seules les lignes retenues sont copiées dans un
+    DataFrame, de sorte que chaque processus ne garde en mémoire privée que l'échantillon.
 
     Args:
-        df (pd.DataFrame): Le DataFrame de base.
+        store (column_store.ColumnStore): Le stockage colonnaire.
 
     Returns:
-        pd.DataFrame: Données enrichies avec la colonne 'Resolution'.
+        pd.DataFrame: Échantillon avec latitude, longitude, type de crime, année, jour et poids.
     """
-    df = df.copy()
-    if df['arrest'].dtype == 'bool':
-        df['Resolution'] = df['arrest'].map({True: 'Arrested', False: 'Not Arrested'})
-    else:
-        df['Resolution'] = pd.to_numeric(df['arrest'], errors='coerce').fillna(0).astype(bool)
-        df['Resolution'] = df['Resolution'].map({True: 'Arrested', False: 'Not Arrested'})
-    
-    df['Resolution'] = df['Resolution'].astype('category')
-    return df
-
-
-def prepare_line_chart_data(df: pd.DataFrame) -> pd.DataFrame:
+    selected = np.asarray(store.aggregates["map_sample"])
+    weights = np.asarray(store.aggregates["map_weights"])
+    return pd.DataFrame({
+        "latitude": store["latitude"][selected],
+        "longitude": store["longitude"][selected],
+        "primary_type": pd.Categorical.from_codes(store["crime"][selected], categories=store.crime_types),
+        "year": store["year"][selected],
+        "day": store["day"][selected],
+        sampling.WEIGHT_COLUMN: weights,
+    }, index=selected)
+
+
+def preprocess_dashboard(source: str = LOCAL_FILE, url: str = DROPBOX_URL, years: tuple = None) -> dict:
     """
-    Prépare les données pour un graphique linéaire par heure et mois.
+    Prépare les données du tableau de bord directement à partir du stockage colonnaire,
+    sans matérialiser le jeu de données complet en pandas : l'échantillon de la carte
+    et l'index de sommes cumulées par jour servant toutes les autres visualisations.
 
     Args:
-        df (pd.DataFrame): Le DataFrame de base.
-
-    Returns:
-        pd.DataFrame: Données avec colonnes supplémentaires pour heure, mois et type de crime.
-    """
-    df = df.copy()    
-    df['hour'] = df['date'].dt.hour.astype('int8')
-    df['month'] = df['date'].dt.month.astype('int8')
-    df['crime_grouped'] = df['Crime_Type'].astype('category')
-    return df
-
-
-def preprocess_all() -> dict:
-    """
-    Charge et prépare l'ensemble des données pour les différents types de visualisations.
+        source, url, years: Voir load_main_dataset.
 
     Returns:
-        dict: Dictionnaire contenant les DataFrames préparés pour bar, map, sankey et line.
+        dict: {"store": ColumnStore, "map": DataFrame échantillonné, "dates": DateRangeIndex}
     """
-    df = load_main_dataset()
-    data = {
-        "bar": prepare_bar_chart_data(df),
-        "line": prepare_line_chart_data(df),
-        "map": prepare_map_data(df),
-        "sankey": prepare_sankey_data(df)
+    store = load_column_store(source, url, years)
+    return {
+        "store": store,
+        "map": sample_map_store(store),
+        "dates": date_index.DateRangeIndex(store),
     }
-    return data
@@ -0,0 +1,135 @@
+"""
+registry.py
+
+Registry of the datasets served by one dashboard process (cities, year ranges,
+refreshed snapshots...). Datasets are declared in a JSON file mapping a name to
+its source:
+
+    {"chicago": {"label": "Chicago 2018–2024", "source": "chicago.parquet",
+                 "center": {"lat": 41.8781, "lon": -87.6298}, "zoom": 10, "boundaries": "boundaries"},
+     "chicago-recent": {"label": "Chicago 2022–2024", "source": "chicago.parquet", "years": [2022, 2024]}}
+
+Optional keys: "url" (download address of a missing source), "years" (first
+and last year kept), "center" and "zoom" (initial map view, by default the
+middle of the dataset's extent at zoom 10) and "boundaries" (folder of the
+dataset's GeoJSON boundary files, see choropleth.py; no choropleth without it).
+
+Each dataset is loaded on first request and kept resident while the total
+size of the loaded datasets fits in a memory budget; beyond it, the least
+recently used datasets are evicted. Memory-mapped column stores live in the OS
+page cache and are shared between processes, so only private memory counts.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pre_process_data
+
+DATASETS_FILE = os.environ.get("DASH_DATASETS", "datasets.json")
+MEMORY_BUDGET = int(float(os.environ.get("DATASET_MEMORY_MB", 4096)) * 2 ** 20)
+
+# Used when DATASETS_FILE does not exist: the single dataset of pre_process_data
+DEFAULT_DATASETS = {
+    "chicago": {"label": "Chicago 2018–2024", "source": pre_process_data.LOCAL_FILE, "url": pre_process_data.DROPBOX_URL,
+                "center": {"lat": 41.8781, "lon": -87.6298}, "zoom": 10, "boundaries": "boundaries"},
+}
+
+
+def load_specs(path: str = DATASETS_FILE) -> dict:
+    """
+    Args:
+        path (str): JSON file declaring the datasets.
+
+    Returns:
+        dict: Dataset name → spec ("label", "source" and the optional keys above),
+            in declaration order; the first one is the default dataset.
+    """
+    if not os.path.exists(path):
+        return dict(DEFAULT_DATASETS)
+    with open(path, encoding="utf-8") as f:
+        specs = json.load(f, object_pairs_hook=OrderedDict)
+    if not specs:
+        raise ValueError(f"{path} declares no dataset")
+    return {name: dict(spec, label=spec.get("label", name)) for name, spec in specs.items()}
+
+
+class DatasetRegistry:
+    """
+    Loads datasets on demand and evicts the least recently used ones beyond a memory budget.
+    """
+
+    def __init__(self, specs: dict, loader, budget: int = MEMORY_BUDGET):
+        """
+        Args:
+            specs (dict): Output of load_specs.
+            loader (callable): Builds the data of a dataset from its spec; the
+                result must report its private memory in an nbytes attribute.
+            budget (int): Memory budget in bytes. The most recently used dataset
+                always stays resident, even if it alone exceeds the budget.
+        """
+        self.specs = specs
+        self.default = next(iter(specs))
+        self.budget = budget
+        self._loader = loader
+        self._resident = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    def get(self, name: str = None):
+        """
+        Data of a dataset, loading it if needed. Concurrent callers asking for the
+        same dataset wait for a single load; other datasets stay available meanwhile.
+
+        Args:
+            name (str): Dataset name; None or an unknown name selects the default dataset.
+
+        Returns:
+            The loader's result for that dataset.
+        """
+        if name not in self.specs:
+            name = self.default
+        with self._lock:
+            if name in self._resident:
+                self._resident.move_to_end(name)
+                return self._resident[name]
+            load_lock = self._loading.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if name in self._resident:
+                    self._resident.move_to_end(name)
+                    return self._resident[name]
+            data = self._loader(self.specs[name])
+            with self._lock:
+                self._resident[name] = data
+                self._sizes[name] = int(data.nbytes)
+                self._evict()
+        return data
+
+    def _evict(self):
+        # Called with the lock held; in-flight requests keep their own reference
+        while len(self._resident) > 1 and sum(self._sizes.values()) > self.budget:
+            name, _ = self._resident.popitem(last=False)
+            del self._sizes[name]
+
+    def resident(self) -> dict:
+        """
+        Returns:
+            dict: Name → private memory in bytes of each loaded dataset, least recently used first.
+        """
+        with self._lock:
+            return {name: self._sizes[name] for name in self._resident}
+
+    def options(self) -> list:
+        """
+        Returns:
+            list of dict: Dropdown options of the declared datasets.
+        """
+        return [{"label": spec["label"], "value": name} for name, spec in self.specs.items()]
@@ -0,0 +1,181 @@
+"""
+sampling.py
+
+Sampling engine used to thin the incident data before it reaches the map.
+Includes:
+- Quota allocation per stratum that scales with the stratum size
+- Vectorized stratified sampling (e.g. one stratum per year and crime type),
+  of a DataFrame or of stratum ids alone (e.g. memory-mapped store columns)
+- A stratified reservoir sampler for data arriving in chunks
+
+Every sampled row carries a 'weight' column (stratum size / rows kept), so
+summing weights over any subset gives an unbiased estimate of its true count.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+WEIGHT_COLUMN = 'weight'
+
+
+def allocate_quotas(sizes, fraction: float = 0.02, min_per_stratum: int = 200, max_per_stratum: int = 2000):
+    """
+    Compute how many rows to keep from each stratum.
+
+    Quotas are proportional to the stratum size, bounded below so that rare
+    strata stay visible and above so that large strata stay cheap to cluster.
+
+    Args:
+        sizes (array-like of int): Number of rows in each stratum.
+        fraction (float): Share of each stratum to keep before bounding.
+        min_per_stratum (int): Lower bound of the quota.
+        max_per_stratum (int): Upper bound of the quota.
+
+    Returns:
+        np.ndarray: Quota per stratum, never larger than the stratum itself.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    quotas = np.ceil(sizes * fraction).astype(np.int64)
+    quotas = np.clip(quotas, min_per_stratum, max_per_stratum)
+    return np.minimum(quotas, sizes)
+
+
+def stratified_indices(group_ids, fraction: float = 0.02, min_per_stratum: int = 200,
+                       max_per_stratum: int = 2000, random_state: int = 42) -> tuple:
+    """
+    Draw a reproducible stratified sample of row positions without replacement.
+
+    Rows are ranked within their stratum by a random key in a single lexsort,
+    and the first `quota` rows of each stratum are kept.
+
+    Args:
+        group_ids (array-like of int): Stratum id of each row, in [0, n_strata).
+        fraction (float): See allocate_quotas.
+        min_per_stratum (int): See allocate_quotas.
+        max_per_stratum (int): See allocate_quotas.
+        random_state (int): Seed of the random generator.
+
+    Returns:
+        tuple: (positions of the sampled rows in increasing order, float32 weight of each).
+    """
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    sizes = np.bincount(group_ids)
+    quotas = allocate_quotas(sizes, fraction, min_per_stratum, max_per_stratum)
+
+    rng = np.random.default_rng(random_state)
+    order = np.lexsort((rng.random(len(group_ids)), group_ids))
+    sorted_groups = group_ids[order]
+    starts = np.cumsum(sizes) - sizes
+    rank = np.arange(len(group_ids)) - starts[sorted_groups]
+    selected = np.sort(order[rank < quotas[sorted_groups]])
+
+    weights = sizes / np.maximum(quotas, 1)
+    return selected, weights[group_ids[selected]].astype('float32')
+
+
+def stratified_sample(df: pd.DataFrame, by: list, fraction: float = 0.02, min_per_stratum: int = 200,
+                      max_per_stratum: int = 2000, random_state: int = 42) -> pd.DataFrame:
+    """
+    Draw a reproducible stratified sample without replacement (see stratified_indices).
+
+    Args:
+        df (pd.DataFrame): Rows to sample; the `by` columns must not contain NaN.
+        by (list of str): Columns defining the strata.
+        fraction (float): See allocate_quotas.
+        min_per_stratum (int): See allocate_quotas.
+        max_per_stratum (int): See allocate_quotas.
+        random_state (int): Seed of the random generator.
+
+    Returns:
+        pd.DataFrame: Sampled rows in their original order, with a 'weight' column.
+    """
+    if df.empty:
+        return df.assign(**{WEIGHT_COLUMN: np.array([], dtype='float32')})
+
+    group_ids = df.groupby(by, observed=True, sort=False).ngroup().to_numpy()
+    selected, weights = stratified_indices(group_ids, fraction, min_per_stratum, max_per_stratum, random_state)
+    sample = df.iloc[selected].copy()
+    sample[WEIGHT_COLUMN] = weights
+    return sample
+
+
+class StratifiedReservoir:
+    """
+    Reservoir sampler (Algorithm R) keeping a fixed-size sample per stratum.
+
+    Chunks are offered with update(); each stratum of a chunk is processed with
+    vectorized draws, so the cost is linear in the chunk size and independent
+    of how many rows were seen before.
+    """
+
+    def __init__(self, by: list, capacity: int = 2000, random_state: int = 42):
+        """
+        Args:
+            by (list of str): Columns defining the strata.
+            capacity (int): Maximum number of rows kept per stratum.
+            random_state (int): Seed of the random generator.
+        """
+        self.by = list(by)
+        self.capacity = capacity
+        self._rng = np.random.default_rng(random_state)
+        self._columns = None
+        self._reservoirs = {}
+        self._seen = {}
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Offer a chunk of rows to the sampler.
+
+        Args:
+            chunk (pd.DataFrame): Rows with the same columns as previous chunks.
+        """
+        if self._columns is None:
+            self._columns = list(chunk.columns)
+        values = {col: chunk[col].to_numpy() for col in self._columns}
+        for key, idx in chunk.groupby(self.by, observed=True, sort=False).indices.items():
+            self._offer(key, {col: arr[idx] for col, arr in values.items()}, len(idx))
+
+    def _offer(self, key, rows: dict, n: int):
+        seen = self._seen.get(key, 0)
+        reservoir = self._reservoirs.get(key)
+
+        # Fill phase: the first `capacity` rows of a stratum are always kept
+        fill = min(max(self.capacity - seen, 0), n)
+        if fill:
+            head = {col: arr[:fill] for col, arr in rows.items()}
+            reservoir = head if reservoir is None else {
+                col: np.concatenate([reservoir[col], head[col]]) for col in rows
+            }
+
+        # Replacement phase: row number i replaces a random slot with probability capacity / (i + 1)
+        if fill < n:
+            positions = np.arange(seen + fill, seen + n)
+            slots = (self._rng.random(n - fill) * (positions + 1)).astype(np.int64)
+            accepted = np.flatnonzero(slots < self.capacity)
+            if accepted.size:
+                # When a slot is drawn several times only the last draw survives, as in the sequential algorithm
+                last_slots, last = np.unique(slots[accepted][::-1], return_index=True)
+                sources = fill + accepted[::-1][last]
+                for col, arr in rows.items():
+                    reservoir[col][last_slots] = arr[sources]
+
+        self._reservoirs[key] = reservoir
+        self._seen[key] = seen + n
+
+    def result(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: Current sample of every stratum, with a 'weight' column.
+        """
+        if not self._reservoirs:
+            return pd.DataFrame(columns=(self._columns or []) + [WEIGHT_COLUMN])
+        frames = []
+        for key, reservoir in self._reservoirs.items():
+            frame = pd.DataFrame(reservoir, columns=self._columns)
+            frame[WEIGHT_COLUMN] = np.float32(self._seen[key] / len(frame))
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
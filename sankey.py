@@ -10,20 +10,9 @@ Date: 2025-06-22
 
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-
-def format_count_k(n):
-    """
-    Format a number using 'k' notation if >= 1000.
-
-    Args:
-        n (int): Number to format.
-
-    Returns:
-        str: Formatted string.
-    """
-    return f"{n/1000:.1f}k" if n >= 1000 else str(n)
 
+import arrest_rates
+import legend
 
 def prepare_nodes(df):
     """
@@ -45,20 +34,20 @@ def prepare_nodes(df):
     return all_nodes, node_dict, crime_left, crime_right, resolutions
 
 
-def calculate_flows(df, node_dict):
+def calculate_flows(flow, node_dict):
     """
     Calculate flow values and prepare link attributes for the Sankey diagram.
 
     Args:
-        df (pd.DataFrame): Input dataframe.
+        flow (pd.DataFrame): Counts per 'Crime_Type' and 'Resolution' (see date_index.DateRangeIndex.sankey_counts).
         node_dict (dict): Mapping of node names to indices.
 
     Returns:
         tuple: sources, targets, values, colors, hover_colors, counts, totals
     """
-    flow = df.groupby(['Crime_Type', 'Resolution']).size().reset_index(name='Count')
-    total_by_crime = df.groupby('Crime_Type').size().reset_index(name='Total')
-    flow = pd.merge(flow, total_by_crime, on='Crime_Type')
+    flow = flow.copy()
+    # Totals come from the aggregated flows rather than a second pass over the rows
+    flow['Total'] = flow.groupby('Crime_Type')['Count'].transform('sum')
     flow['Percentage'] = (flow['Count'] / flow['Total']) * 100
     flow['Source_Index'] = flow['Crime_Type'].map(node_dict)
     flow = flow.sort_values(by='Source_Index')
@@ -67,9 +56,15 @@ def calculate_flows(df, node_dict):
     targets = flow['Resolution'].map(node_dict).tolist()
     values = flow['Percentage'].tolist()
     colors = ['rgba(128,128,128,0.4)'] * len(flow)
-    hover_colors = flow['Resolution'].map(lambda r: 'rgba(46,204,113,0.8)' if r == 'Arrested' else 'rgba(231,76,60,0.8)').tolist()
-    counts = flow['Count'].apply(format_count_k).tolist()
-    totals = flow['Total'].apply(format_count_k).tolist()
+    arrested = (flow['Resolution'] == 'Arrested').to_numpy()
+    hover_colors = np.where(arrested, 'rgba(46,204,113,0.8)', 'rgba(231,76,60,0.8)').tolist()
+    # Arrest rate of the link's crime type with its Wilson interval, shown on hover
+    arrests = flow['Count'].where(flow['Resolution'] == 'Arrested', 0).groupby(flow['Crime_Type']).transform('sum')
+    low, high = arrest_rates.wilson_interval(arrests, flow['Total'])
+    rate_labels = arrest_rates.format_rates(arrests / flow['Total'], low, high)
+    counts = np.char.add(np.char.add(legend.format_counts(flow['Count']).astype(str), "<br>Arrest rate: "),
+                         rate_labels).tolist()
+    totals = legend.format_counts(flow['Total']).tolist()
 
     return sources, targets, values, colors, hover_colors, counts, totals
 
@@ -100,26 +95,20 @@ def get_node_positions(all_nodes, crime_left, resolutions, crime_right):
     return x, y
 
 
-def get_node_colors():
+def get_node_colors(all_nodes, resolutions):
     """
-    Assign a specific color to each node.
+    Assign a specific color to each node: the crime-type color from the legend
+    (generated for types without a custom color) and green/red for resolutions.
+
+    Args:
+        all_nodes (list): All node names.
+        resolutions (list): Resolution labels, ordered as ['Arrested', 'Not Arrested'].
 
     Returns:
         list: List of color strings.
     """
-    return [
-        "#C10B0B", 
-        "#8E44AD",
-        "#2980B9",
-        "#73C836",
-        "#34495E"
-    ] + ['#2ECC71', '#E74C3C'] + [
-        "#09A283",
-        "#F39C12",
-        "#B6C0C1",
-        "#822C22",
-        "#160B6E"
-    ]
+    resolution_colors = dict(zip(resolutions, ['#2ECC71', '#E74C3C']))
+    return [resolution_colors.get(node) or legend.crime_color(node) for node in all_nodes]
 
 
 def create_sankey_figure(all_nodes, node_colors, x, y, totals, sources, targets, values, colors, hover_colors, counts):
@@ -142,6 +131,8 @@ def create_sankey_figure(all_nodes, node_colors, x, y, totals, sources, targets,
     Returns:
         go.Figure: Plotly Sankey figure.
     """
+    import plotly.graph_objects as go
+
     return go.Figure(data=[go.Sankey(
         arrangement="snap",
         node=dict(
@@ -169,23 +160,23 @@ def create_sankey_figure(all_nodes, node_colors, x, y, totals, sources, targets,
     )])
 
 
-def create_sankey(df):
+def create_sankey_from_counts(flow):
     """
-    Orchestrates the creation of the Sankey diagram from raw dataframe.
+    Create the Sankey diagram from precomputed counts (e.g. date_index.DateRangeIndex.sankey_counts).
 
     Args:
-        df (pd.DataFrame): Data with 'Crime_Type' and 'Resolution' columns.
+        flow (pd.DataFrame): Columns 'Crime_Type', 'Resolution' and 'Count'.
 
     Returns:
         go.Figure: Final Sankey diagram figure.
     """
-    if not {'Crime_Type', 'Resolution'}.issubset(df.columns):
-        raise ValueError("Missing required columns: 'Crime_Type' and/or 'Resolution'")
+    if not {'Crime_Type', 'Resolution', 'Count'}.issubset(flow.columns):
+        raise ValueError("Missing required columns: 'Crime_Type', 'Resolution' and/or 'Count'")
     
-    all_nodes, node_dict, crime_left, crime_right, resolutions = prepare_nodes(df)
-    sources, targets, values, colors, hover_colors, counts, totals = calculate_flows(df, node_dict)
+    all_nodes, node_dict, crime_left, crime_right, resolutions = prepare_nodes(flow)
+    sources, targets, values, colors, hover_colors, counts, totals = calculate_flows(flow, node_dict)
     x, y = get_node_positions(all_nodes, crime_left, resolutions, crime_right)
-    node_colors = get_node_colors()
+    node_colors = get_node_colors(all_nodes, resolutions)
     fig = create_sankey_figure(all_nodes, node_colors, x, y, totals, sources, targets, values, colors, hover_colors, counts)
     
     fig.update_layout(
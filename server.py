@@ -1,8 +1,18 @@
 '''
     Contains the server to run our application.
+
+    SERVER_MODE selects how requests are served:
+        pooled (default): one thread per request for assets and cheap callbacks,
+            CPU-heavy callbacks bounded by the pool in workers.py
+        single: the legacy single-threaded development server
+
+    The app is built without loading data. Unless PRELOAD_DATA=0, the data is
+    loaded in a background thread while the server starts listening, so the
+    port opens immediately; requests arriving earlier wait for that load.
 '''
 from flask_failsafe import failsafe
 import os
+import threading
 
 @failsafe
 def create_app():
@@ -13,11 +23,16 @@ def create_app():
             The server to be run
     '''
     # the import is intentionally inside to work with the server failsafe
-    from app import app  # pylint: disable=import-outside-toplevel
-    return app.server
+    import app  # pylint: disable=import-outside-toplevel
+    return app.create_app().server
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8085))
-    create_app().run(host="0.0.0.0", port=port, debug=False, use_reloader=False)
+    threaded = os.environ.get("SERVER_MODE", "pooled") != "single"
+    server = create_app()
+    if os.environ.get("PRELOAD_DATA", "1") != "0":
+        import dashboard_data  # pylint: disable=import-outside-toplevel
+        threading.Thread(target=dashboard_data.get, daemon=True).start()
+    server.run(host="0.0.0.0", port=port, debug=False, use_reloader=False, threaded=threaded)
 
@@ -0,0 +1,49 @@
+"""
+synthetic.py
+
+Synthetic Chicago-like incidents with the same columns and dtypes as
+pre_process_data.load_main_dataset. Used by the benchmarks, and by the dashboard
+itself when CHICAGO_SYNTHETIC is set, so it can run offline without
+chicago.parquet (e.g. for load tests).
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+CRIMES = [
+    "ASSAULT", "BATTERY", "BURGLARY", "CRIMINAL DAMAGE", "DECEPTIVE PRACTICE",
+    "MOTOR VEHICLE THEFT", "NARCOTICS", "OTHER OFFENSE", "ROBBERY", "THEFT"
+]
+
+
+def synthetic_dataset(n_rows: int = 500_000, seed: int = 0) -> pd.DataFrame:
+    """
+    Args:
+        n_rows (int): Number of incidents.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        pd.DataFrame: Incidents from 2018 to 2024 clustered around a few hot spots.
+    """
+    rng = np.random.default_rng(seed)
+    probs = 1.0 / np.arange(1, len(CRIMES) + 1)
+    crime = rng.choice(len(CRIMES), n_rows, p=probs / probs.sum())
+    centers = rng.uniform([41.65, -87.85], [42.0, -87.55], size=(25, 2))
+    center = rng.integers(0, len(centers), n_rows)
+    start = np.datetime64("2018-01-01T00:00", "m")
+    minutes = rng.integers(0, 7 * 365 * 24 * 60, n_rows)
+    date = pd.to_datetime(start + minutes.astype("timedelta64[m]"))
+    primary_type = pd.Categorical.from_codes(crime, CRIMES)
+    return pd.DataFrame({
+        "date": date,
+        "primary_type": primary_type,
+        "arrest": rng.random(n_rows) < 0.1 + 0.05 * crime / len(CRIMES),
+        "latitude": (centers[center, 0] + rng.normal(0, 0.02, n_rows)).astype("float32"),
+        "longitude": (centers[center, 1] + rng.normal(0, 0.02, n_rows)).astype("float32"),
+        "year": date.year.astype("int16"),
+        "Crime_Type": primary_type.rename_categories([c.title() for c in CRIMES]),
+    })
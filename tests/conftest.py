@@ -0,0 +1,32 @@
+"""
+conftest.py
+
+Shared pytest fixtures: a small column store written from synthetic incidents.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import column_store  # noqa: E402
+import date_index  # noqa: E402
+from synthetic import synthetic_dataset  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def store(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("data") / "store")
+    column_store.write_store(synthetic_dataset(20_000, seed=1), directory)
+    return column_store.ColumnStore(directory)
+
+
+@pytest.fixture(scope="session")
+def date_idx(store):
+    return date_index.DateRangeIndex(store)
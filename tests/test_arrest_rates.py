@@ -0,0 +1,43 @@
+"""
+test_arrest_rates.py
+
+Wilson score intervals of arrest_rates.py.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+
+import arrest_rates
+
+
+def test_wilson_interval_known_values():
+    low, high = arrest_rates.wilson_interval([0, 5, 10], [10, 10, 10], z=1.96)
+    np.testing.assert_allclose(low, [0.0, 0.2366, 0.7225], atol=1e-4)
+    np.testing.assert_allclose(high, [0.2775, 0.7634, 1.0], atol=1e-4)
+
+
+def test_wilson_interval_properties():
+    rng = np.random.default_rng(0)
+    totals = rng.integers(1, 5000, 1000)
+    successes = rng.integers(0, totals + 1)
+    low, high = arrest_rates.wilson_interval(successes, totals)
+    rate = successes / totals
+    assert ((low <= rate + 1e-12) & (rate <= high + 1e-12)).all()
+    assert ((low >= -1e-12) & (high <= 1 + 1e-12)).all()
+    # Swapping arrests and non-arrests mirrors the interval
+    mirror_low, mirror_high = arrest_rates.wilson_interval(totals - successes, totals)
+    np.testing.assert_allclose(low, 1 - mirror_high, atol=1e-12)
+    np.testing.assert_allclose(high, 1 - mirror_low, atol=1e-12)
+    # More incidents, narrower interval at the same rate
+    small = np.subtract(*arrest_rates.wilson_interval(30, 100)[::-1])
+    large = np.subtract(*arrest_rates.wilson_interval(300, 1000)[::-1])
+    assert large < small
+
+
+def test_wilson_interval_empty():
+    low, high = arrest_rates.wilson_interval([0, 3], [0, 6])
+    assert np.isnan(low[0]) and np.isnan(high[0])
+    assert 0 < low[1] < 0.5 < high[1] < 1
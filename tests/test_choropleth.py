@@ -0,0 +1,53 @@
+"""
+test_choropleth.py
+
+Point-in-polygon assignment of choropleth.PolygonIndex.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+
+import choropleth
+
+
+def square(lon0, lat0, lon1, lat1) -> list:
+    return [[lon0, lat0], [lon1, lat0], [lon1, lat1], [lon0, lat1], [lon0, lat0]]
+
+
+FEATURES = [
+    # Square with a hole
+    {"geometry": {"type": "Polygon", "coordinates": [square(0, 0, 2, 2), square(0.5, 0.5, 1.5, 1.5)]}},
+    # Two disjoint parts
+    {"geometry": {"type": "MultiPolygon", "coordinates": [[square(3, 0, 4, 1)], [square(3, 2, 4, 3)]]}},
+    {"geometry": {"type": "Polygon", "coordinates": [[[0, 3], [2, 3], [1, 5], [0, 3]]]}},
+    {"geometry": None},
+]
+
+
+def test_assign_known_points():
+    lat = [0.25, 1.0, 0.5, 2.5, 4.0, 1.5, 10.0, 0.25]
+    lon = [0.25, 1.0, 3.5, 3.5, 1.0, 3.5, 10.0, 0.25]
+    areas = choropleth.PolygonIndex(FEATURES, grid=8).assign(lat, lon)
+    np.testing.assert_array_equal(areas, [0, -1, 1, 1, 2, -1, -1, 0])
+    assert areas.dtype == np.int16
+
+
+def test_assign_matches_brute_force():
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-1, 6, 5000).astype(np.float32)
+    lon = rng.uniform(-1, 5, 5000).astype(np.float32)
+    # Repeated coordinates go through the deduplication
+    lat, lon = np.concatenate([lat, lat[:500]]), np.concatenate([lon, lon[:500]])
+
+    expected = np.full(len(lat), -1)
+    for index, feature in enumerate(FEATURES):
+        rings = choropleth._feature_rings(feature["geometry"])  # pylint: disable=protected-access
+        if rings:
+            inside = choropleth.points_in_rings(lon.astype(np.float64), lat.astype(np.float64), rings)
+            expected[inside] = index
+
+    for grid in (1, 4, 128):
+        np.testing.assert_array_equal(choropleth.PolygonIndex(FEATURES, grid=grid).assign(lat, lon), expected)
@@ -0,0 +1,78 @@
+"""
+test_date_index.py
+
+Range queries of date_index.DateRangeIndex against a scan of the store columns.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+import pytest
+
+RANGES = [(None, None), (0, 0), (10, 400), (365, 730), (-50, 20), (2000, 99999), (300, 200)]
+
+
+def in_range(store, date_idx, start, end):
+    # Rows of the inclusive range of day offsets, None for open ends
+    offset = np.asarray(store["day"], dtype=np.int64) - date_idx.first_day
+    start = 0 if start is None else start
+    end = date_idx.n_days - 1 if end is None else end
+    return (offset >= start) & (offset <= end)
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_type_counts(store, date_idx, start, end):
+    rows = in_range(store, date_idx, start, end)
+    expected = np.bincount(store["crime"][rows], minlength=len(store.crime_types))
+    np.testing.assert_array_equal(date_idx.type_counts(start, end), expected)
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_arrest_counts(store, date_idx, start, end):
+    rows = in_range(store, date_idx, start, end)
+    n_crimes = len(store.crime_types)
+    flat = store["crime"][rows].astype(np.int64) * 2 + store["arrest"][rows]
+    expected = np.bincount(flat, minlength=n_crimes * 2).reshape(n_crimes, 2)
+    np.testing.assert_array_equal(date_idx.arrest_counts(start, end), expected)
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_hour_counts(store, date_idx, start, end):
+    rows = in_range(store, date_idx, start, end)
+    n_crimes = len(store.crime_types)
+    flat = store["crime"][rows].astype(np.int64) * 24 + store["hour"][rows]
+    expected = np.bincount(flat, minlength=n_crimes * 24).reshape(n_crimes, 24)
+    np.testing.assert_array_equal(date_idx.hour_counts(start, end), expected)
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_period_counts(store, date_idx, start, end):
+    rows = in_range(store, date_idx, start, end)
+    n_crimes = len(store.crime_types)
+    weekend = store["weekday"][rows] >= 5
+    flat = store["crime"][rows].astype(np.int64) * 2 + weekend
+    expected = np.bincount(flat, minlength=n_crimes * 2).reshape(n_crimes, 2)
+    np.testing.assert_array_equal(date_idx.period_counts(start, end), expected)
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_cell_counts(store, date_idx, start, end):
+    rows = in_range(store, date_idx, start, end)
+    _, size = store.grid
+    expected = np.bincount(store["cell"][rows], minlength=size * size)
+    np.testing.assert_array_equal(date_idx.cell_counts(start, end), expected)
+
+
+def test_offsets_cover_the_store(store, date_idx):
+    day = np.asarray(store["day"])
+    assert date_idx.first_day == day.min()
+    assert date_idx.n_days == day.max() - day.min() + 1
+    assert date_idx.type_counts().sum() == len(store)
+    assert date_idx.offset(str(date_idx.dates[0])) == 0
+
+
+def test_line_counts_years_add_up(store, date_idx):
+    counts = date_idx.line_counts("year")
+    assert counts["count"].sum() == len(store)
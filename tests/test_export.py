@@ -0,0 +1,50 @@
+"""
+test_export.py
+
+Rows selected by export.py against the counts previewed from the prefix sums.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import pytest
+
+import export
+
+
+def filter_cases(date_idx):
+    return [
+        export.ExportFilters(),
+        export.ExportFilters(day_range=date_idx.absolute_days(100, 500)),
+        export.ExportFilters(years=[2019, 2021]),
+        export.ExportFilters(codes=[0, 3]),
+        export.ExportFilters(day_range=date_idx.absolute_days(300, 1200), years=[2019, 2021], codes=[1]),
+        export.ExportFilters(day_range=date_idx.absolute_days(50, 60), years=[2023]),
+    ]
+
+
+def exported_rows(store, filters: export.ExportFilters) -> int:
+    return sum(int(filters.mask(store, slice(begin, begin + 4096)).sum()) for begin in range(0, len(store), 4096))
+
+
+def test_preview_matches_export(store, date_idx):
+    for filters in filter_cases(date_idx):
+        preview = export.preview_count(date_idx, store, filters)
+        assert preview["exact"]
+        assert preview["rows"] == exported_rows(store, filters)
+
+
+def test_record_batches_row_count(store, date_idx):
+    pytest.importorskip("pyarrow")
+    for filters in filter_cases(date_idx):
+        batches = list(export.record_batches(store, filters, batch_rows=1000))
+        assert sum(batch.num_rows for batch in batches) == export.preview_count(date_idx, store, filters)["rows"]
+        assert all(batch.num_rows < 2000 for batch in batches)
+
+
+def test_preview_with_bounds_is_estimated(store, date_idx):
+    bounds, _ = store.grid
+    preview = export.preview_count(date_idx, store, export.ExportFilters(bounds=bounds))
+    assert not preview["exact"]
+    assert preview["rows"] == len(store)
@@ -0,0 +1,60 @@
+"""
+test_sampling.py
+
+Quota allocation and stratified sampling of sampling.py.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import numpy as np
+
+import column_store
+import sampling
+
+
+def test_allocate_quotas_bounds():
+    sizes = np.array([0, 50, 500, 20_000, 1_000_000])
+    quotas = sampling.allocate_quotas(sizes, fraction=0.02, min_per_stratum=200, max_per_stratum=2000)
+    # Small strata are kept whole, mid-sized ones get the minimum, large ones the fraction up to the maximum
+    np.testing.assert_array_equal(quotas, [0, 50, 200, 400, 2000])
+    assert (quotas <= sizes).all()
+
+
+def test_allocate_quotas_rounds_up():
+    quotas = sampling.allocate_quotas([10_001], fraction=0.02, min_per_stratum=0, max_per_stratum=10_000)
+    np.testing.assert_array_equal(quotas, [201])
+
+
+def test_stratified_indices_meet_quotas():
+    rng = np.random.default_rng(0)
+    group_ids = rng.choice(5, 50_000, p=[0.6, 0.3, 0.07, 0.029, 0.001])
+    sizes = np.bincount(group_ids, minlength=5)
+    selected, weights = sampling.stratified_indices(group_ids, fraction=0.02, min_per_stratum=100,
+                                                    max_per_stratum=500)
+    quotas = sampling.allocate_quotas(sizes, 0.02, 100, 500)
+
+    assert (np.diff(selected) > 0).all()
+    np.testing.assert_array_equal(np.bincount(group_ids[selected], minlength=5), quotas)
+    # Weights of a stratum add up to its size
+    np.testing.assert_allclose(np.bincount(group_ids[selected], weights=weights, minlength=5), sizes, rtol=1e-5)
+
+
+def test_stratified_indices_reproducible():
+    group_ids = np.arange(10_000) % 7
+    first = sampling.stratified_indices(group_ids, random_state=3)
+    second = sampling.stratified_indices(group_ids, random_state=3)
+    other = sampling.stratified_indices(group_ids, random_state=4)
+    np.testing.assert_array_equal(first[0], second[0])
+    assert not np.array_equal(first[0], other[0])
+
+
+def test_stored_map_sample(store):
+    # The sample saved with the store matches a fresh draw over (year, crime type) strata
+    year = np.asarray(store["year"], dtype=np.int64)
+    group_ids = (year - year.min()) * len(store.crime_types) + store["crime"]
+    selected, weights = sampling.stratified_indices(group_ids, random_state=42, **column_store.MAP_SAMPLE)
+    np.testing.assert_array_equal(store.aggregates["map_sample"], selected)
+    np.testing.assert_array_equal(store.aggregates["map_weights"], weights)
+
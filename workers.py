@@ -0,0 +1,114 @@
+"""
+workers.py
+
+Execution helpers for the CPU-heavy Dash callbacks (the DBSCAN clustering done
+by map.create_map). Includes:
+- A bounded thread pool capping how many heavy callbacks run at once
+- Single-flight coalescing of identical in-flight figure requests
+- An optional Dash background-callback manager backed by a local disk queue
+
+The pool runs in the web-server process and shares its GIL: it bounds
+concurrency and deduplicates work, it does not isolate the heavy work from
+the request threads. Isolation comes from the background-callback manager,
+whose jobs run in separate processes.
+
+Author: Team 13
+Course: INF8808 – Data Visualization
+Date: June 2025
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of heavy callbacks allowed to run at the same time
+HEAVY_WORKERS = int(os.environ.get("HEAVY_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+
+# Seconds a request waits for a heavy result before failing
+HEAVY_TIMEOUT = float(os.environ.get("HEAVY_TIMEOUT", 120))
+
+# Directory of the disk-based job queue used by background callbacks
+JOB_CACHE_DIR = os.environ.get("DASH_JOB_CACHE", ".dash_jobs")
+
+
+class SingleFlightPool:
+    """
+    Bounded thread pool where concurrent submissions sharing a key run once.
+    Its threads share the GIL with the request threads (see the module docstring).
+
+    The first caller for a key schedules the work; callers arriving while it is
+    still running receive the same future instead of queuing a duplicate job.
+    Once the job finishes the key is released, so later calls recompute.
+    """
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="heavy")
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        Schedule fn(*args, **kwargs) unless a job with the same key is running.
+
+        Args:
+            key (hashable): Identifies the result (e.g. figure name and its inputs).
+            fn (callable): Function computing the result.
+
+        Returns:
+            concurrent.futures.Future: Future shared by every caller of this key.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._release(key, done))
+        return future
+
+    def _release(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+
+heavy_pool = SingleFlightPool(HEAVY_WORKERS)
+
+
+def run_heavy(key, fn, *args, **kwargs):
+    """
+    Run a CPU-heavy function on the bounded pool and wait for its result.
+
+    Args:
+        key (hashable): Coalescing key; identical keys share one computation.
+        fn (callable): Function computing the result.
+
+    Returns:
+        Any: The value returned by fn.
+    """
+    return heavy_pool.submit(key, fn, *args, **kwargs).result(timeout=HEAVY_TIMEOUT)
+
+
+def background_callback_manager():
+    """
+    Build the Dash background-callback manager when DASH_BACKGROUND_CALLBACKS=1.
+
+    Jobs are queued in a local diskcache directory (JOB_CACHE_DIR) and executed
+    by worker processes, so heavy callbacks never hold a web-server thread.
+    diskcache, multiprocess and psutil (Dash's "diskcache" extra) are listed in
+    requirements.txt.
+
+    Returns:
+        dash.DiskcacheManager or None: The manager, or None when disabled.
+    """
+    if os.environ.get("DASH_BACKGROUND_CALLBACKS", "0") != "1":
+        return None
+    try:
+        import diskcache  # pylint: disable=import-outside-toplevel
+        from dash import DiskcacheManager  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise RuntimeError(
+            "DASH_BACKGROUND_CALLBACKS=1 requires dash>=2.6 and diskcache "
+            "(pip install 'dash[diskcache]')"
+        ) from e
+    return DiskcacheManager(diskcache.Cache(JOB_CACHE_DIR))